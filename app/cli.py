@@ -0,0 +1,140 @@
+# Headless command line for scripted work: imports, exports, stats, search,
+# backups and maintenance. Never imports PyQt6, and each subcommand imports
+# only what it needs, so a run costs a Python start plus one query.
+#
+# Usage: python -m app.cli [--db students.db] <command> ...
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _import(args) -> int:
+    from app.items.importer import import_students
+
+    def progress(report):
+        if args.verbose:
+            print(f"  {report.total} rows, {report.imported} imported, {report.rejected} rejected",
+                  file=sys.stderr)
+
+    report = import_students(args.path, chunk_size=args.chunk_size, rejects_path=args.rejects,
+                             progress=progress)
+    print(f"Imported {report.imported} of {report.total} rows in {report.seconds:.2f}s "
+          f"({report.rows_per_second:,.0f} rows/s)")
+    if report.rejects_path:
+        print(f"{report.rejected} rejected rows written to {report.rejects_path}")
+    return 0 if not report.rejected else 1
+
+
+def _export(args) -> int:
+    from app.items.service import StudentService
+    if args.roster == "registered":
+        result = StudentService.export_registered(args.path)
+    else:
+        result = StudentService.export_enrolled(args.path, args.grade, args.strand)
+    if not result.ok:
+        print(result.error.message, file=sys.stderr)
+        return 1
+    print(f"Exported {result.value} students to {args.path}")
+    return 0
+
+
+def _stats(args) -> int:
+    from app.items.service import StudentService
+    stats, roster = StudentService.enrollment_report()
+    print(f"Registered: {stats.registered}")
+    print(f"Enrolled:   {stats.enrolled}")
+    for grade, count in sorted(stats.by_grade.items()):
+        print(f"  Grade {grade}: {count}")
+    for (grade, strand), count in sorted(stats.by_grade_strand.items()):
+        print(f"    {grade} {strand}: {count}")
+    for gender, count in sorted(stats.by_gender.items()):
+        print(f"  {gender or 'Unspecified'}: {count}")
+    if args.list:
+        for row in roster:
+            print(f"{row['id']}\t{row['full_name']}\t{row['grade_level']} {row['strand']}")
+    return 0
+
+
+def _search(args) -> int:
+    from app.items.repository import RegisteredStudentRepo
+    students = RegisteredStudentRepo.search_status_rows(args.query, args.status, limit=args.limit)
+    for s in students:
+        placement = f"{s.grade_level} {s.strand}" if s.grade_level else "unenrolled"
+        print(f"{s.id}\t{s.full_name}\t{s.contact or ''}\t{placement}")
+    return 0 if students else 1
+
+
+def _backup(args) -> int:
+    from app.core.backup import backup_database
+    report = backup_database(args.dest, compress=args.compress, keep=args.keep)
+    print(f"Wrote {report.path}: {report.bytes / 1048576:.1f} MB in {report.seconds:.2f}s "
+          f"({report.mb_per_second:.1f} MB/s)")
+    return 0
+
+
+def _vacuum(args) -> int:
+    from app.core.db import vacuum
+    before, after = vacuum()
+    print(f"Vacuumed: {before / 1048576:.1f} MB -> {after / 1048576:.1f} MB")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="SHS Enrollment System (headless)")
+    parser.add_argument("--db", help="database file (default: students.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="import a CSV/XLSX roster into registered students")
+    p.add_argument("path")
+    p.add_argument("--chunk-size", type=int, default=2000)
+    p.add_argument("--rejects", help="where to write rejected rows (default: <name>_rejected.csv)")
+    p.add_argument("-v", "--verbose", action="store_true", help="print progress per chunk")
+    p.set_defaults(run=_import)
+
+    p = commands.add_parser("export", help="export a roster to CSV, JSON Lines or XLSX")
+    p.add_argument("roster", choices=["registered", "enrolled"])
+    p.add_argument("path", help="output file; the format follows the extension")
+    p.add_argument("--grade", help="enrolled only: grade level")
+    p.add_argument("--strand", help="enrolled only: strand")
+    p.set_defaults(run=_export)
+
+    p = commands.add_parser("stats", help="print enrollment totals")
+    p.add_argument("--list", action="store_true", help="also list the enrolled students")
+    p.set_defaults(run=_stats)
+
+    p = commands.add_parser("search", help="search registered students")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--status", choices=["enrolled", "unenrolled"], help="only students with this status")
+    p.set_defaults(run=_search)
+
+    p = commands.add_parser("backup", help="write an online snapshot of the database")
+    p.add_argument("dest", help="snapshot directory")
+    p.add_argument("--compress", action="store_true", help="gzip the snapshot")
+    p.add_argument("--keep", type=int, default=10, help="snapshots to keep")
+    p.set_defaults(run=_backup)
+
+    p = commands.add_parser("vacuum", help="compact the database and refresh query statistics")
+    p.set_defaults(run=_vacuum)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from app.core import db
+    from app.core.instrumentation import enable_from_env
+    if args.db:
+        db.configure(args.db)
+    enable_from_env()
+    db.init_db()
+    try:
+        return args.run(args)
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+log = logging.getLogger("app.backup")
+
+SNAPSHOT_PREFIX = "students-"
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+@dataclass
+class BackupReport:
+    path: str
+    pages: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    compressed: bool = False
+    integrity: str = ""
+    restarts: int = 0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1048576 / self.seconds if self.seconds else 0.0
+
+
+def _snapshot_path(dest_dir: str, compress: bool) -> str:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+    ext = ".db.gz" if compress else ".db"
+    path = os.path.join(dest_dir, f"{SNAPSHOT_PREFIX}{stamp}{ext}")
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(dest_dir, f"{SNAPSHOT_PREFIX}{stamp}-{n}{ext}")
+        n += 1
+    return path
+
+
+def _integrity(conn: sqlite3.Connection) -> str:
+    rows = conn.execute("PRAGMA integrity_check").fetchall()
+    return "; ".join(str(r[0]) for r in rows)
+
+
+def backup_database(dest_dir: str, pages: int = 256, sleep: float = 0.005, compress: bool = False,
+                    keep: Optional[int] = 10, db_name: str = None, max_restarts: int = 3,
+                    progress: Optional[Callable[[int, int], None]] = None) -> BackupReport:
+    # Copy the live database to a timestamped snapshot in `dest_dir` while
+    # the app keeps running. The copy goes `pages` pages at a time with
+    # `sleep` seconds between steps, so readers and writers are only ever
+    # held up for one step. The snapshot is integrity-checked before it is
+    # kept; older snapshots beyond `keep` are deleted.
+    #
+    # A commit from another connection between steps restarts the copy.
+    # After `max_restarts` of those the rest is copied in a single step,
+    # which under WAL reads one snapshot without blocking writers.
+    from app.core.db import connect
+    os.makedirs(dest_dir, exist_ok=True)
+    path = _snapshot_path(dest_dir, compress)
+    part = path + ".part"
+    report = BackupReport(path=path, compressed=compress)
+    start = time.perf_counter()
+
+    last_remaining = [None]
+
+    def step(status, remaining, total):
+        if last_remaining[0] is not None and remaining > last_remaining[0]:
+            report.restarts += 1
+            if report.restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining[0] = remaining
+        report.pages = total
+        if progress:
+            progress(total - remaining, total)
+
+    source = connect(db_name)
+    try:
+        page_size = source.execute("PRAGMA page_size").fetchone()[0]
+        target = sqlite3.connect(part)
+        try:
+            try:
+                source.backup(target, pages=pages, progress=step, sleep=sleep)
+            except _TooManyRestarts:
+                source.backup(target)
+                report.pages = source.execute("PRAGMA page_count").fetchone()[0]
+            # The live file is WAL; a snapshot is a single self-contained file
+            target.execute("PRAGMA journal_mode = DELETE")
+            report.integrity = _integrity(target)
+        finally:
+            target.close()
+    except BaseException:
+        _remove(part)
+        raise
+    finally:
+        source.close()
+
+    if report.integrity != "ok":
+        _remove(part)
+        raise BackupError(f"Snapshot failed integrity check: {report.integrity}")
+    report.bytes = report.pages * page_size
+    if compress:
+        with open(part, "rb") as src, gzip.open(path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        _remove(part)
+    else:
+        os.replace(part, path)
+    report.seconds = time.perf_counter() - start
+    log.info("Backup %s: %d pages, %.1f MB in %.2fs (%.1f MB/s)", path, report.pages,
+             report.bytes / 1048576, report.seconds, report.mb_per_second)
+    if keep is not None:
+        rotate(dest_dir, keep)
+    return report
+
+
+def list_snapshots(dest_dir: str) -> List[str]:
+    # Snapshot paths, oldest first
+    if not os.path.isdir(dest_dir):
+        return []
+    paths = [os.path.join(dest_dir, n) for n in os.listdir(dest_dir)
+             if n.startswith(SNAPSHOT_PREFIX) and (n.endswith(".db") or n.endswith(".db.gz"))]
+    return sorted(paths, key=lambda p: (os.path.getmtime(p), p))
+
+
+def rotate(dest_dir: str, keep: int) -> List[str]:
+    # Delete all but the newest `keep` snapshots; returns the deleted paths
+    snapshots = list_snapshots(dest_dir)
+    stale = snapshots[:max(len(snapshots) - keep, 0)]
+    for path in stale:
+        _remove(path)
+    return stale
+
+
+def verify_snapshot(path: str) -> str:
+    # Run PRAGMA integrity_check on a snapshot; "ok" when it is sound
+    if not path.endswith(".gz"):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return _integrity(conn)
+        finally:
+            conn.close()
+    fd, tmp = tempfile.mkstemp(suffix=".db")
+    try:
+        with gzip.open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        return verify_snapshot(tmp)
+    finally:
+        _remove(tmp)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class BackupScheduler:
+    """Takes a snapshot every `interval` seconds on a daemon thread."""
+
+    def __init__(self, dest_dir: str, interval: float = 3600.0, **options):
+        self.dest_dir = dest_dir
+        self.interval = interval
+        self.options = options
+        self.last_report: Optional[BackupReport] = None
+        self.last_error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_now(self) -> BackupReport:
+        try:
+            self.last_report = backup_database(self.dest_dir, **self.options)
+            self.last_error = None
+        except (sqlite3.Error, OSError, BackupError) as e:
+            self.last_error = e
+            log.error("Scheduled backup failed: %s", e)
+            raise
+        return self.last_report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_now()
+            except (sqlite3.Error, OSError, BackupError):
+                pass
@@ -1,62 +1,233 @@
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+from app.core import instrumentation, replica
+from app.core.migrations import migrate
 
 DB_NAME = "students.db"
+ID_PREFIX = "S"
+# First split of an unbounded ID space (see assign_id_range): numbers below
+# this keep the six-digit S-number width
+ID_SPACE_END = 1000000
 
-def get_connection():
-    conn = sqlite3.connect(DB_NAME)
+# Pragmas applied to every new connection. journal_mode is persistent in the
+# database file; the rest are per-connection settings.
+PRAGMA_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,       # negative = KiB, ~16 MB page cache
+    "mmap_size": 134217728,     # 128 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # ms to wait on a locked database
+    "foreign_keys": "ON",
+    # Rows removed by INSERT OR REPLACE fire DELETE triggers only with this
+    # on; the counters, search index and change log triggers rely on it
+    "recursive_triggers": "ON",
+}
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections = set()
+_generation = 0
+
+
+class IdRangeExhaustedError(Exception):
+    """This database has handed out every ID in its assigned range."""
+
+
+def configure(db_name: str = None, **pragmas):
+    # Change the database file and/or pragma profile; open connections are
+    # closed so the next get_connection() picks up the new settings.
+    global DB_NAME
+    if db_name is not None:
+        DB_NAME = db_name
+    PRAGMA_PROFILE.update(pragmas)
+    close_connections()
+
+
+def connect(db_name: str = None, **overrides) -> sqlite3.Connection:
+    # Open a new connection with the pragma profile applied. Use this for
+    # dedicated connections that must not be shared with get_connection().
+    conn = sqlite3.connect(db_name or DB_NAME, check_same_thread=False,
+                           factory=instrumentation.connection_factory())
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    profile = dict(PRAGMA_PROFILE, **overrides)
+    for name, value in profile.items():
+        conn.execute(f"PRAGMA {name} = {value}")
     return conn
 
-def init_db():
-    with get_connection() as conn:
-        cur = conn.cursor()
-
-        #Table for registered students
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS registered_students (
-            id TEXT PRIMARY KEY,
-            first_name TEXT NOT NULL,
-            middle_name TEXT,
-            last_name TEXT NOT NULL,
-            gender TEXT,
-            birth_date TEXT,
-            age INTEGER,
-            contact TEXT,
-            guardian_name TEXT,
-            guardian_contact TEXT
-        )
-        """)
-
-        #Table for enrolled students
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS enrolled_students (
-            id TEXT PRIMARY KEY,
-            grade_level TEXT NOT NULL,
-            strand TEXT NOT NULL,
-            FOREIGN KEY(id) REFERENCES registered_students(id) ON DELETE CASCADE
-        )
-        """)
+
+def get_connection() -> sqlite3.Connection:
+    # Return this thread's persistent connection, opening it on first use
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.generation == _generation:
+        return conn
+    conn = connect()
+    with _registry_lock:
+        _open_connections.add(conn)
+        _local.generation = _generation
+    _local.conn = conn
+    return conn
+
+
+def connection_generation() -> int:
+    # Bumped by close_connections(); lets holders of their own connections
+    # notice a configure() and reopen
+    return _generation
+
+
+def close_connections():
+    # Close every pooled connection (all threads); they reopen lazily
+    global _generation
+    with _registry_lock:
+        conns = list(_open_connections)
+        _open_connections.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _local.conn = None
+    current = replica.get_replica()
+    if current is not None:
+        current.close()
+
+
+def read_connection() -> sqlite3.Connection:
+    # Connection for read-mostly work (dashboard, filters, exports): the
+    # in-memory replica when one is enabled, else get_connection()
+    current = replica.get_replica()
+    return current.connection() if current is not None else get_connection()
+
+
+@contextmanager
+def read_transaction(conn: sqlite3.Connection = None):
+    # Snapshot-consistent read: every query inside sees the same committed
+    # state. Under WAL this never blocks writers on other connections.
+    # Pass read_connection() to read the snapshot from the replica.
+    conn = conn or get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+
+
+@contextmanager
+def write_transaction():
+    # Take the write lock up front so concurrent writers queue on
+    # busy_timeout instead of failing halfway through the transaction.
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
         conn.commit()
 
-#Generator for id and iterator for next id
-def generate_next_id(table_name: str) -> str:
 
-    with get_connection() as conn:
-        cur = conn.cursor()
-        cur.execute(f"SELECT id FROM {table_name} ORDER BY id DESC LIMIT 1")
+def init_db():
+    # Bring the schema up to date; cheap when it already is
+    migrate(get_connection())
+
+
+def format_student_id(num: int) -> str:
+    return f"{ID_PREFIX}{num:06d}"
+
+
+def _seed_sequence(cur, table_name: str):
+    # First use on an existing database: continue after the highest S-number
+    cur.execute(f"""
+        INSERT OR IGNORE INTO id_sequences (name, next_value)
+        SELECT ?, COALESCE(MAX(CAST(substr(id, 2) AS INTEGER)), 0) + 1
+        FROM {table_name} WHERE id GLOB '{ID_PREFIX}[0-9]*'
+    """, (table_name,))
+
+
+def reserve_ids(table_name: str, count: int = 1, conn: sqlite3.Connection = None) -> range:
+    # Reserve a block of `count` sequence numbers. When `conn` is given the
+    # reservation joins the caller's open transaction and is rolled back with
+    # it; otherwise it is committed immediately (e.g. for offline blocks).
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    own = conn is None
+    if own:
+        conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("UPDATE id_sequences SET next_value = next_value + ? WHERE name = ?", (count, table_name))
+        if cur.rowcount == 0:
+            _seed_sequence(cur, table_name)
+            cur.execute("UPDATE id_sequences SET next_value = next_value + ? WHERE name = ?", (count, table_name))
+        cur.execute("SELECT next_value FROM id_sequences WHERE name = ?", (table_name,))
+        end = cur.fetchone()[0]
+        limit = _id_limit(cur, table_name)
+        if limit is not None and end > limit:
+            raise IdRangeExhaustedError(f"No {table_name} IDs left below {format_student_id(limit)}")
+        if own:
+            conn.commit()
+    except BaseException:
+        if own:
+            conn.rollback()
+        raise
+    return range(end - count, end)
+
+
+def _id_limit(cur, table_name: str):
+    # Exclusive upper bound of this database's ID range; None = unbounded
+    cur.execute("SELECT value FROM sync_state WHERE name = ?", (f"id_limit:{table_name}",))
+    row = cur.fetchone()
+    return int(row[0]) if row else None
+
+
+def id_range(table_name: str, conn: sqlite3.Connection) -> tuple:
+    # (next number to hand out, exclusive limit or None when unbounded)
+    cur = conn.cursor()
+    cur.execute("SELECT next_value FROM id_sequences WHERE name = ?", (table_name,))
+    row = cur.fetchone()
+    if row is None:
+        _seed_sequence(cur, table_name)
+        cur.execute("SELECT next_value FROM id_sequences WHERE name = ?", (table_name,))
         row = cur.fetchone()
+    return row[0], _id_limit(cur, table_name)
+
+
+def assign_id_range(table_name: str, start: int, limit: int, conn: sqlite3.Connection):
+    # Restrict this database to IDs in [start, limit). Workstations that sync
+    # get disjoint ranges (app.core.sync.clone_database), so offline
+    # registrations never collide.
+    conn.execute("INSERT OR REPLACE INTO id_sequences (name, next_value) VALUES (?, ?)", (table_name, start))
+    conn.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                 (f"id_limit:{table_name}", str(limit)))
 
-        if row and row["id"]:
-            last_id = str(row["id"])
 
-            if last_id.startswith("S") and last_id[2:].isdigit():
-                next_num = int(last_id[2:]) + 1
-            else:
-                next_num = 1
-        else:
-            next_num = 1
+#Allocate the next id from the sequence table
+def generate_next_id(table_name: str, conn: sqlite3.Connection = None) -> str:
+    return format_student_id(reserve_ids(table_name, 1, conn)[0])
 
 
-        new_id = f"S{next_num:06d}"
-        return new_id
+def vacuum(db_name: str = None) -> tuple:
+    # Fold the WAL back in, rebuild the file and refresh planner statistics.
+    # Returns (bytes before, bytes after). Takes an exclusive lock while it runs.
+    path = db_name or DB_NAME
+    conn = connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        before = os.path.getsize(path)
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        after = os.path.getsize(path)
+    finally:
+        conn.close()
+    return before, after
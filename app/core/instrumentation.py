@@ -0,0 +1,266 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+slow_log = logging.getLogger("app.sql.slow")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(sql: str) -> str:
+    # Normalise SQL so the same query with different literals or IN-list
+    # lengths is counted as one statement shape
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _is_query(sql: str) -> bool:
+    words = sql.split(None, 1)
+    return bool(words) and words[0].upper() in ("SELECT", "WITH")
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _ShapeStats:
+    __slots__ = ("count", "total", "rows", "max", "window")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.max = 0.0
+        self.window = deque(maxlen=window)
+
+
+class QueryMonitor:
+    """Collects per-statement timings from instrumented connections."""
+
+    def __init__(self, slow_ms: float = 100.0, explain: bool = False, window: int = 1000):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.window = window
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, _ShapeStats] = {}
+
+    def record(self, conn: sqlite3.Connection, sql: str, params: Any, rows: int, seconds: float):
+        shape = statement_shape(sql)
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = self._shapes[shape] = _ShapeStats(self.window)
+            stats.count += 1
+            stats.total += seconds
+            stats.rows += max(rows, 0)
+            stats.max = max(stats.max, seconds)
+            stats.window.append(seconds)
+        if seconds * 1000 >= self.slow_ms:
+            self._log_slow(conn, sql, params, rows, seconds)
+
+    def _log_slow(self, conn, sql, params, rows, seconds):
+        nparams = len(params) if params is not None else 0
+        slow_log.warning("%.1f ms, %d params, %d rows: %s",
+                         seconds * 1000, nparams, rows, _WHITESPACE.sub(" ", sql).strip())
+        if self.explain and _is_query(sql):
+            try:
+                # A plain cursor so the plan query itself is not recorded
+                plan = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+                for row in plan:
+                    slow_log.warning("    plan: %s", row[-1])
+            except sqlite3.Error as e:
+                slow_log.warning("    plan unavailable: %s", e)
+
+    def report(self) -> List[Dict[str, Any]]:
+        # Per-shape summary, slowest total time first; times in milliseconds
+        with self._lock:
+            items = [(shape, s.count, s.total, s.rows, s.max, sorted(s.window))
+                     for shape, s in self._shapes.items()]
+        result = []
+        for shape, count, total, rows, worst, ordered in items:
+            result.append({
+                "statement": shape,
+                "count": count,
+                "rows": rows,
+                "total_ms": total * 1000,
+                "p50_ms": _percentile(ordered, 50) * 1000,
+                "p95_ms": _percentile(ordered, 95) * 1000,
+                "p99_ms": _percentile(ordered, 99) * 1000,
+                "max_ms": worst * 1000,
+            })
+        result.sort(key=lambda r: r["total_ms"], reverse=True)
+        return result
+
+    def format_report(self, limit: int = 20) -> str:
+        lines = [f"{'count':>7} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'rows':>8}  statement"]
+        for r in self.report()[:limit]:
+            lines.append(f"{r['count']:>7} {r['total_ms']:>10.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                         f"{r['p99_ms']:>8.2f} {r['rows']:>8}  {r['statement'][:100]}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute() plus the fetches that drain its result."""
+
+    def _finish(self):
+        pending = getattr(self, "_pending", None)
+        if pending is not None:
+            self._pending = None
+            if _monitor is not None:
+                _monitor.record(self.connection, *pending)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._pending = [sql, parameters, max(self.rowcount, 0), elapsed]
+            if self.description is None:
+                # Not a query: nothing left to fetch
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            if _monitor is not None:
+                _monitor.record(self.connection, sql, None, max(self.rowcount, 0), time.perf_counter() - start)
+
+    def _fetched(self, rows: int, elapsed: float, exhausted: bool):
+        pending = getattr(self, "_pending", None)
+        if pending is not None:
+            pending[2] += rows
+            pending[3] += elapsed
+            if exhausted:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, time.perf_counter() - start, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), time.perf_counter() - start, not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), time.perf_counter() - start, True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(0, time.perf_counter() - start, True)
+            raise
+        self._fetched(1, time.perf_counter() - start, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+_monitor: Optional[QueryMonitor] = None
+# The slow-query log file enable() attached, if any
+_log_handler: Optional[logging.Handler] = None
+
+
+def connection_factory():
+    # Connection class for app.core.db.connect(); the plain sqlite3 class
+    # while instrumentation is off, so disabled overhead is zero
+    return InstrumentedConnection if _monitor is not None else sqlite3.Connection
+
+
+def enable(slow_ms: float = 100.0, explain: bool = False, window: int = 1000,
+           log_path: Optional[str] = None) -> QueryMonitor:
+    # Start recording every statement. Pooled connections are reopened so
+    # they pick up the instrumented classes.
+    global _monitor, _log_handler
+    from app.core.db import close_connections
+    _monitor = QueryMonitor(slow_ms=slow_ms, explain=explain, window=window)
+    # Enabling again replaces the log file rather than adding a second one
+    _remove_log_handler()
+    if log_path:
+        _log_handler = logging.FileHandler(log_path, encoding="utf-8")
+        _log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(_log_handler)
+    close_connections()
+    return _monitor
+
+
+def disable():
+    global _monitor
+    from app.core.db import close_connections
+    _monitor = None
+    _remove_log_handler()
+    close_connections()
+
+
+def _remove_log_handler():
+    global _log_handler
+    if _log_handler is not None:
+        slow_log.removeHandler(_log_handler)
+        _log_handler.close()
+        _log_handler = None
+
+
+def get_monitor() -> Optional[QueryMonitor]:
+    return _monitor
+
+
+def enable_from_env() -> Optional[QueryMonitor]:
+    # SHS_SQL_SLOW_MS=50 [SHS_SQL_EXPLAIN=1] [SHS_SQL_LOG=slow.log] turns
+    # instrumentation on for a production run without code changes
+    slow_ms = os.environ.get("SHS_SQL_SLOW_MS")
+    if not slow_ms:
+        return None
+    return enable(slow_ms=float(slow_ms),
+                  explain=os.environ.get("SHS_SQL_EXPLAIN") == "1",
+                  log_path=os.environ.get("SHS_SQL_LOG") or None)
@@ -0,0 +1,314 @@
+import sqlite3
+
+FTS_TABLE = "registered_students_fts"
+FTS_COLUMNS = ("id", "first_name", "middle_name", "last_name",
+               "contact", "guardian_name", "guardian_contact")
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _create_search_index(conn: sqlite3.Connection):
+    # External-content FTS5 index over registered_students, kept in sync by
+    # triggers. Skipped when this SQLite build lacks FTS5; search() then
+    # falls back to LIKE.
+    if not fts5_available(conn):
+        return
+    cols = ", ".join(FTS_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {cols},
+            content='registered_students', content_rowid='rowid',
+            prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON registered_students BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON registered_students BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON registered_students BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+            INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _bump(name_expr: str, delta: int) -> str:
+    return (f"INSERT INTO enrollment_counters (name, value) VALUES ({name_expr}, {delta}) "
+            f"ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;")
+
+
+def _registered_counters(row: str, delta: int) -> str:
+    return (_bump("'registered'", delta)
+            + _bump(f"'registered:gender:' || COALESCE({row}.gender, '')", delta))
+
+
+def _placement_counters(row: str, delta: int) -> str:
+    return (_bump(f"'enrolled:grade:' || {row}.grade_level", delta)
+            + _bump(f"'enrolled:grade_strand:' || {row}.grade_level || ':' || {row}.strand", delta))
+
+
+def _create_counters(conn: sqlite3.Connection):
+    # Aggregate counts kept exact by triggers so the dashboard reads one
+    # small table instead of counting the rosters. Keys look like
+    # "enrolled:grade_strand:11:STEM"; see EnrollmentStats.from_counters.
+    # A row that INSERT OR REPLACE removes only reaches the DELETE triggers
+    # with PRAGMA recursive_triggers on (set in app.core.db.PRAGMA_PROFILE);
+    # connections without it must not REPLACE into the rosters.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS enrollment_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    triggers = {
+        "counters_registered_ai": ("AFTER INSERT ON registered_students",
+                                   _registered_counters("new", 1)),
+        "counters_registered_ad": ("AFTER DELETE ON registered_students",
+                                   _registered_counters("old", -1)),
+        "counters_registered_au": ("AFTER UPDATE OF gender ON registered_students",
+                                   _bump("'registered:gender:' || COALESCE(old.gender, '')", -1)
+                                   + _bump("'registered:gender:' || COALESCE(new.gender, '')", 1)),
+        "counters_enrolled_ai": ("AFTER INSERT ON enrolled_students",
+                                 _bump("'enrolled'", 1) + _placement_counters("new", 1)),
+        "counters_enrolled_ad": ("AFTER DELETE ON enrolled_students",
+                                 _bump("'enrolled'", -1) + _placement_counters("old", -1)),
+        "counters_enrolled_au": ("AFTER UPDATE OF grade_level, strand ON enrolled_students",
+                                 _placement_counters("old", -1) + _placement_counters("new", 1)),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+    # Seed from the rows already in the database
+    conn.execute("DELETE FROM enrollment_counters")
+    conn.execute("""
+        INSERT INTO enrollment_counters (name, value)
+        SELECT 'registered', COUNT(*) FROM registered_students
+        UNION ALL
+        SELECT 'registered:gender:' || COALESCE(gender, ''), COUNT(*)
+        FROM registered_students GROUP BY COALESCE(gender, '')
+        UNION ALL
+        SELECT 'enrolled', COUNT(*) FROM enrolled_students
+        UNION ALL
+        SELECT 'enrolled:grade:' || grade_level, COUNT(*)
+        FROM enrolled_students GROUP BY grade_level
+        UNION ALL
+        SELECT 'enrolled:grade_strand:' || grade_level || ':' || strand, COUNT(*)
+        FROM enrolled_students GROUP BY grade_level, strand
+    """)
+
+
+# Tables whose changes are recorded in change_log, with the columns each
+# change record carries
+CHANGE_LOG_TABLES = {
+    "registered_students": ("id", "first_name", "middle_name", "last_name", "gender", "birth_date",
+                            "age", "contact", "guardian_name", "guardian_contact"),
+    "enrolled_students": ("id", "grade_level", "strand"),
+}
+
+
+def _create_change_log(conn: sqlite3.Connection):
+    # Change-data capture for app.core.sync. Every insert, update and delete
+    # appends one row holding the new row as JSON (NULL for deletes). While
+    # sync_state.applying is '1' the triggers stay quiet, so merged changes
+    # are not logged again and echoed back to the peer they came from.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            payload TEXT,
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log (tbl, row_id, seq)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("INSERT OR IGNORE INTO sync_state VALUES ('node_id', lower(hex(randomblob(8))))")
+    conn.execute("INSERT OR IGNORE INTO sync_state VALUES ('applying', '0')")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            node_id TEXT PRIMARY KEY,
+            received_seq INTEGER NOT NULL DEFAULT 0,
+            acked_seq INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    when = "WHEN (SELECT value FROM sync_state WHERE name = 'applying') = '0'"
+    for table, columns in CHANGE_LOG_TABLES.items():
+        short = table.split("_")[0]
+        payload = "json_object(" + ", ".join(f"'{c}', new.{c}" for c in columns) + ")"
+        for suffix, event, op, row, body in (
+            ("ai", "AFTER INSERT", "I", "new", payload),
+            ("au", "AFTER UPDATE", "U", "new", payload),
+            ("ad", "AFTER DELETE", "D", "old", "NULL"),
+        ):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS change_log_{short}_{suffix} {event} ON {table} {when} BEGIN
+                    INSERT INTO change_log (tbl, row_id, op, payload)
+                    VALUES ('{table}', {row}.id, '{op}', {body});
+                END
+            """)
+
+
+# Ordered schema migrations. A database's PRAGMA user_version records the
+# last one applied; each entry runs once, in its own transaction. Statements
+# are written to be safe on students.db files created before versioning.
+MIGRATIONS = [
+    # 1: base schema
+    (
+        """
+        CREATE TABLE IF NOT EXISTS registered_students (
+            id TEXT PRIMARY KEY,
+            first_name TEXT NOT NULL,
+            middle_name TEXT,
+            last_name TEXT NOT NULL,
+            gender TEXT,
+            birth_date TEXT,
+            age INTEGER,
+            contact TEXT,
+            guardian_name TEXT,
+            guardian_contact TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS enrolled_students (
+            id TEXT PRIMARY KEY,
+            grade_level TEXT NOT NULL,
+            strand TEXT NOT NULL,
+            FOREIGN KEY(id) REFERENCES registered_students(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS id_sequences (
+            name TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        )
+        """,
+    ),
+    # 2: indexes for the grade/strand filter, name sorts and the enrolled join
+    (
+        """
+        CREATE INDEX IF NOT EXISTS idx_enrolled_grade_strand
+        ON enrolled_students (grade_level, strand, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_registered_last_name
+        ON registered_students (last_name COLLATE NOCASE, first_name COLLATE NOCASE)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_registered_first_name
+        ON registered_students (first_name COLLATE NOCASE)
+        """,
+        # Covers the name columns the enrolled JOIN reads from registered_students
+        """
+        CREATE INDEX IF NOT EXISTS idx_registered_join_names
+        ON registered_students (id, first_name, middle_name, last_name)
+        """,
+        "ANALYZE",
+    ),
+    # 3: full-text search index
+    (
+        _create_search_index,
+    ),
+    # 4: trigger-maintained dashboard counters
+    (
+        _create_counters,
+    ),
+    # 5: seek indexes for keyset pagination (sort key + id tiebreaker)
+    (
+        "DROP INDEX IF EXISTS idx_registered_last_name",
+        """
+        CREATE INDEX IF NOT EXISTS idx_registered_name_order
+        ON registered_students (last_name COLLATE NOCASE, first_name COLLATE NOCASE, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_enrolled_strand
+        ON enrolled_students (strand, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_enrolled_grade
+        ON enrolled_students (grade_level, id)
+        """,
+    ),
+    # 6: change log for workstation sync
+    (
+        _create_change_log,
+    ),
+    # 7: stored Merkle digests, kept current from change_log by app.core.sync
+    (
+        """
+        CREATE TABLE IF NOT EXISTS sync_row_digests (
+            tbl TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            row_id TEXT NOT NULL,
+            digest INTEGER NOT NULL,
+            PRIMARY KEY (tbl, bucket, row_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sync_leaf_digests (
+            tbl TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            digest INTEGER NOT NULL,
+            PRIMARY KEY (tbl, bucket)
+        ) WITHOUT ROWID
+        """,
+    ),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    # Apply pending migrations; a no-op when the schema is already current
+    version = get_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+    if conn.in_transaction:
+        conn.commit()
+    while version < SCHEMA_VERSION:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            version = get_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                break
+            step = MIGRATIONS[version]
+            for statement in step:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            version += 1
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return version
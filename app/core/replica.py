@@ -0,0 +1,255 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.core import instrumentation
+
+_names = itertools.count(1)
+
+
+class _Copy:
+    """One shared-cache memory database and the change_log seq it reflects."""
+
+    def __init__(self, uri: str, anchor: sqlite3.Connection, state: tuple):
+        self.uri = uri
+        # Keeps the memory database alive and applies changes to it
+        self.anchor = anchor
+        self.seq, self.schema, self.merges = state
+
+    def close(self):
+        self.anchor.close()
+
+
+class Replica:
+    """In-memory copy of the database for read-heavy work.
+
+    A dedicated watcher connection polls PRAGMA data_version. When another
+    connection has committed, the rows change_log recorded since the last
+    refresh are replayed into a standby copy, which is then swapped in; the
+    copy readers were on becomes the next standby. A reader in the middle of
+    a query therefore finishes on the copy it started with.
+
+    The database is only copied in full (sqlite3 backup API) on the first
+    read, and when replaying can't reproduce it: the schema changed, a sync
+    merge wrote rows without logging them, or change_log was pruned past
+    the standby. `max_lag` (seconds) skips the version check for that long
+    after the last one; 0 checks on every read.
+    """
+
+    def __init__(self, db_name: str = None, max_lag: float = 0.0):
+        self.db_name = db_name
+        self.max_lag = max_lag
+        self.refreshes = 0
+        self.full_copies = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # reader connection -> uri of the copy it reads
+        self._readers = {}
+        self._source = None
+        self._current: Optional[_Copy] = None
+        self._standby: Optional[_Copy] = None
+        self._uri = None
+        self._version = None
+        self._checked = 0.0
+
+    def connection(self) -> sqlite3.Connection:
+        # This thread's read-only connection to the current copy. Inside a
+        # read_transaction() it stays on the copy the transaction started on.
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and conn.in_transaction:
+            return conn
+        self._maybe_refresh()
+        uri = self._uri
+        if conn is not None and self._local.uri == uri:
+            return conn
+        if conn is not None:
+            self._discard(conn)
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               factory=instrumentation.connection_factory())
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        with self._lock:
+            self._readers[conn] = uri
+        self._local.conn, self._local.uri = conn, uri
+        return conn
+
+    def refresh(self, force: bool = False) -> bool:
+        # Bring the copy up to date if the database changed (with force,
+        # recopy it in full); returns True when a newer copy was swapped in
+        with self._lock:
+            return self._refresh_locked(force)
+
+    def _maybe_refresh(self):
+        if self._uri is not None and time.monotonic() - self._checked < self.max_lag:
+            return
+        # While another thread is refreshing, keep reading the current copy
+        if not self._lock.acquire(blocking=self._uri is None):
+            return
+        try:
+            self._refresh_locked(False)
+        finally:
+            self._lock.release()
+
+    def _refresh_locked(self, force: bool) -> bool:
+        from app.core.db import connect
+        self._checked = time.monotonic()
+        if self._source is None:
+            self._source = connect(self.db_name)
+        # Read the version first: a commit during the refresh shows up next check
+        version = self._source.execute("PRAGMA data_version").fetchone()[0]
+        if not force and self._current is not None and version == self._version:
+            return False
+        # One read transaction, so the state and the changes (or the full
+        # copy) describe the same commit
+        self._source.execute("BEGIN")
+        try:
+            state = self._source_state()
+            if force or self._current is None or state is None:
+                fresh = self._copy_source(state)
+            else:
+                fresh = self._standby or self._clone(self._current)
+                if not self._catch_up(fresh, state):
+                    fresh = self._copy_source(state)
+        finally:
+            self._source.rollback()
+        if self._standby is not None and self._standby is not fresh:
+            self._standby.close()
+        self._standby, self._current = self._current, fresh
+        self._uri, self._version = fresh.uri, version
+        self.refreshes += 1
+        return True
+
+    def _source_state(self) -> Optional[tuple]:
+        # (last change_log seq, schema version, merges), or None when the
+        # database has no change_log to replay from
+        cur = self._source.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'")
+        if cur.fetchone() is None:
+            return None
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        row = cur.fetchone()
+        schema = cur.execute("PRAGMA schema_version").fetchone()[0]
+        cur.execute("SELECT value FROM sync_state WHERE name = 'merges'")
+        merges = cur.fetchone()
+        return (row[0] if row else 0, schema, merges[0] if merges else "0")
+
+    def _new_copy(self, state: Optional[tuple]) -> _Copy:
+        uri = f"file:shs_replica_{os.getpid()}_{next(_names)}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return _Copy(uri, anchor, state or (None, None, None))
+
+    def _prepare(self, copy: _Copy):
+        # Replayed rows are already in change_log; keep the copy's
+        # triggers from logging them again
+        if copy.seq is not None:
+            with copy.anchor:
+                copy.anchor.execute("UPDATE sync_state SET value = '1' WHERE name = 'applying'")
+
+    def _copy_source(self, state: Optional[tuple]) -> _Copy:
+        copy = self._new_copy(state)
+        try:
+            self._source.backup(copy.anchor)
+            self._prepare(copy)
+        except BaseException:
+            copy.close()
+            raise
+        self.full_copies += 1
+        return copy
+
+    def _clone(self, current: _Copy) -> _Copy:
+        # The first standby: a memory-to-memory copy of the current one
+        copy = self._new_copy((current.seq, current.schema, current.merges))
+        try:
+            current.anchor.backup(copy.anchor)
+        except BaseException:
+            copy.close()
+            raise
+        return copy
+
+    def _catch_up(self, copy: _Copy, state: tuple) -> bool:
+        # Replay change_log into `copy`; False means it needs a full copy
+        from app.core.migrations import CHANGE_LOG_TABLES
+        from app.core.sync import _upsert_sql
+        seq, schema, merges = state
+        if copy.seq is None or (schema, merges) != (copy.schema, copy.merges):
+            return False
+        if seq > copy.seq:
+            oldest = self._source.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+            if oldest is None or oldest > copy.seq + 1:
+                return False  # pruned past this copy
+        # A reader pinned to the standby by a read transaction would see
+        # the replay; leave the copy alone and take a fresh one
+        if any(c.in_transaction for c, uri in self._readers.items() if uri == copy.uri):
+            return False
+        upserts = {table: _upsert_sql(table) for table in CHANGE_LOG_TABLES}
+        changes = self._source.execute(
+            "SELECT tbl, row_id, op, payload FROM change_log WHERE seq > ? AND seq <= ? ORDER BY seq",
+            (copy.seq, seq))
+        try:
+            with copy.anchor:
+                cur = copy.anchor.cursor()
+                for table, row_id, op, payload in changes:
+                    if op == "D":
+                        cur.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+                    else:
+                        values = json.loads(payload)
+                        cur.execute(upserts[table], [values.get(c) for c in CHANGE_LOG_TABLES[table]])
+        except sqlite3.OperationalError:
+            # A straggling reader still holds the standby's tables
+            return False
+        copy.seq = seq
+        return True
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._readers.pop(conn, None)
+        conn.close()
+
+    def close(self):
+        # Drop every copy and connection; the next read starts over
+        with self._lock:
+            conns = list(self._readers) + [self._source]
+            conns += [copy.anchor for copy in (self._current, self._standby) if copy is not None]
+            self._readers.clear()
+            self._current = self._standby = None
+            self._source = self._uri = self._version = None
+        for conn in conns:
+            if conn is not None:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+        self._local = threading.local()
+
+
+_replica: Optional[Replica] = None
+
+
+def enable(max_lag: float = 0.0) -> Replica:
+    # Route app.core.db.read_connection() to an in-memory replica
+    global _replica
+    disable()
+    _replica = Replica(max_lag=max_lag)
+    return _replica
+
+
+def disable():
+    global _replica
+    if _replica is not None:
+        _replica.close()
+    _replica = None
+
+
+def get_replica() -> Optional[Replica]:
+    return _replica
+
+
+def enable_from_env() -> Optional[Replica]:
+    # SHS_REPLICA=1 [SHS_REPLICA_LAG=2.0] serves dashboards, filters and
+    # exports from memory
+    if os.environ.get("SHS_REPLICA") != "1":
+        return None
+    return enable(max_lag=float(os.environ.get("SHS_REPLICA_LAG") or 0))
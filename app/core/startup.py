@@ -0,0 +1,48 @@
+import logging
+import os
+import sys
+import time
+from typing import List, Tuple
+
+log = logging.getLogger("app.startup")
+
+
+class StartupTimer:
+    """Wall-clock marks from start-up to the first painted window.
+
+    Each mark records the time since the previous one and since the timer
+    was created. Disabled timers ignore marks, so call sites stay in place.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float, float]] = []
+        self._last = self.start
+        self._reported = False
+
+    def mark(self, label: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.marks.append((label, now - self._last, now - self.start))
+        self._last = now
+
+    def format_report(self) -> str:
+        lines = [f"{'startup phase':<28}{'ms':>9}{'total ms':>10}"]
+        for label, step, total in self.marks:
+            lines.append(f"{label:<28}{step * 1000:>9.1f}{total * 1000:>10.1f}")
+        return "\n".join(lines)
+
+    def report(self):
+        # Print and log the marks once (later calls do nothing)
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        text = self.format_report()
+        print(text, file=sys.stderr)
+        log.info("Startup timing:\n%s", text)
+
+
+# SHS_STARTUP_TIMING=1 prints imports, init_db, window and first-paint times
+timer = StartupTimer(os.environ.get("SHS_STARTUP_TIMING") == "1")
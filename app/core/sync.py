@@ -0,0 +1,522 @@
+import gzip
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.migrations import CHANGE_LOG_TABLES
+
+# Merkle leaves per table; divergent leaves are found by walking down the
+# tree, so only the differing buckets' rows need comparing
+DIGEST_BUCKETS = 1024
+
+# The table whose IDs are allocated per workstation
+ID_TABLE = "registered_students"
+
+
+@dataclass
+class Change:
+    seq: int
+    table: str
+    row_id: str
+    op: str                                  # "I", "U" or "D"
+    payload: Optional[Dict[str, Any]]        # the new row; None for deletes
+    changed_at: str
+
+
+@dataclass
+class ChangeBatch:
+    """Changes one workstation ships to another.
+
+    `acked_seq` tells the receiver how far into *its* change_log the sender
+    had merged when the batch was made; later local changes to the same
+    rows are conflicts.
+    """
+    node_id: str
+    acked_seq: int
+    changes: List[Change] = field(default_factory=list)
+
+    @property
+    def last_seq(self) -> int:
+        return self.changes[-1].seq if self.changes else 0
+
+
+@dataclass
+class SyncConflict:
+    table: str
+    row_id: str
+    local: Optional[Dict[str, Any]]
+    remote: Optional[Dict[str, Any]]
+    local_at: str
+    remote_at: str
+    winner: str                              # "local" or "remote"
+
+
+@dataclass
+class MergeReport:
+    received: int = 0
+    applied: int = 0
+    skipped: int = 0
+    conflicts: List[SyncConflict] = field(default_factory=list)
+    # Two different students inserted under one id on both sides: the later
+    # insert moves to a new id allocated by the workstation that made it
+    rekeyed: List[Tuple[str, str]] = field(default_factory=list)   # local (old id, new id)
+    held_back: List[str] = field(default_factory=list)             # remote ids left for the peer to move
+    seconds: float = 0.0
+
+
+def node_id(conn: sqlite3.Connection) -> str:
+    return conn.execute("SELECT value FROM sync_state WHERE name = 'node_id'").fetchone()[0]
+
+
+def _peer(conn: sqlite3.Connection, peer_id: str) -> Tuple[int, int]:
+    row = conn.execute("SELECT received_seq, acked_seq FROM sync_peers WHERE node_id = ?",
+                       (peer_id,)).fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def export_changes(conn: sqlite3.Connection, peer_id: str) -> ChangeBatch:
+    # Every local change `peer_id` has not confirmed yet. Re-sending is
+    # harmless: the receiver skips sequence numbers it already merged.
+    received, acked = _peer(conn, peer_id)
+    cur = conn.execute("SELECT seq, tbl, row_id, op, payload, changed_at FROM change_log "
+                       "WHERE seq > ? ORDER BY seq", (acked,))
+    changes = [Change(seq, tbl, row_id, op, json.loads(payload) if payload else None, changed_at)
+               for seq, tbl, row_id, op, payload, changed_at in cur]
+    return ChangeBatch(node_id(conn), received, changes)
+
+
+def write_batch(path: str, batch: ChangeBatch):
+    data = {
+        "node_id": batch.node_id,
+        "acked_seq": batch.acked_seq,
+        "changes": [[c.seq, c.table, c.row_id, c.op, c.payload, c.changed_at] for c in batch.changes],
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def read_batch(path: str) -> ChangeBatch:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return ChangeBatch(data["node_id"], data["acked_seq"], [Change(*c) for c in data["changes"]])
+
+
+def _current_row(cur, table: str, row_id: str) -> Optional[Dict[str, Any]]:
+    columns = CHANGE_LOG_TABLES[table]
+    row = cur.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (row_id,)).fetchone()
+    return dict(zip(columns, row)) if row else None
+
+
+def _upsert_sql(table: str) -> str:
+    columns = CHANGE_LOG_TABLES[table]
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}")
+
+
+def _rekey_student(cur, old_id: str) -> str:
+    # Move a local student (and their enrollment) to a fresh id from this
+    # database's range. Runs with change logging on, so the peer receives the
+    # student under the new id.
+    from app.core.db import format_student_id, reserve_ids
+    new_id = format_student_id(reserve_ids(ID_TABLE, 1, cur.connection)[0])
+    cur.execute("UPDATE registered_students SET id = ? WHERE id = ?", (new_id, old_id))
+    cur.execute("UPDATE enrolled_students SET id = ? WHERE id = ?", (new_id, old_id))
+    return new_id
+
+
+def apply_changes(conn: sqlite3.Connection, batch: ChangeBatch) -> MergeReport:
+    # Merge a peer's batch in one transaction. Only the last change per row
+    # matters. A row this database also changed since the peer last merged
+    # from us is a conflict: the later edit wins (node id breaks ties, so
+    # both sides pick the same winner) and the pair is reported.
+    #
+    # A student inserted on both sides under the same id is not a conflict
+    # but two different students. The earlier insert keeps the id; the later
+    # one is moved to a new id by the workstation that inserted it, so its
+    # changes are held back here until they arrive under that id.
+    from app.core.db import ID_PREFIX, id_range
+    start = time.perf_counter()
+    report = MergeReport(received=len(batch.changes))
+    local_node = node_id(conn)
+    if batch.node_id == local_node:
+        raise ValueError("Cannot merge a batch from this database into itself")
+    _begin(conn)
+    try:
+        cur = conn.cursor()
+        received, _ = _peer(conn, batch.node_id)
+        latest: Dict[Tuple[str, str], Change] = {}
+        for change in batch.changes:
+            if change.seq <= received:
+                report.skipped += 1
+                continue
+            latest.pop((change.table, change.row_id), None)
+            latest[(change.table, change.row_id)] = change
+        # Newest unseen local edit per row
+        local_edits = {(tbl, row_id): changed_at for tbl, row_id, changed_at in cur.execute(
+            "SELECT tbl, row_id, MAX(changed_at) FROM change_log WHERE seq > ? GROUP BY tbl, row_id",
+            (batch.acked_seq,))}
+        local_inserts = dict(cur.execute(
+            "SELECT row_id, MIN(changed_at) FROM change_log WHERE seq > ? AND tbl = ? AND op = 'I' "
+            "GROUP BY row_id", (batch.acked_seq, ID_TABLE)).fetchall())
+        remote_inserts = {}
+        for change in batch.changes:
+            if change.seq > received and change.table == ID_TABLE and change.op == "I":
+                remote_inserts.setdefault(change.row_id, change.changed_at)
+
+        cur.execute("PRAGMA defer_foreign_keys = ON")
+        held = set()
+        written = set()   # ids whose stored digests need recomputing
+        for row_id in sorted(local_inserts.keys() & remote_inserts.keys()):
+            remote = latest.get((ID_TABLE, row_id))
+            if remote is not None and _current_row(cur, ID_TABLE, row_id) == remote.payload:
+                continue  # the same student on both sides
+            if (local_inserts[row_id], local_node) < (remote_inserts[row_id], batch.node_id):
+                held.add(row_id)
+                report.held_back.append(row_id)
+            else:
+                report.rekeyed.append((row_id, _rekey_student(cur, row_id)))
+                written.add(row_id)
+                for table in CHANGE_LOG_TABLES:
+                    local_edits.pop((table, row_id), None)
+
+        cur.execute("UPDATE sync_state SET value = '1' WHERE name = 'applying'")
+        upserts = {table: _upsert_sql(table) for table in CHANGE_LOG_TABLES}
+        for key, change in sorted(latest.items(), key=lambda item: item[1].seq):
+            table, row_id = key
+            if row_id in held:
+                report.skipped += 1
+                continue
+            local_at = local_edits.get(key)
+            if local_at is not None:
+                local = _current_row(cur, table, row_id)
+                if local == change.payload:
+                    report.skipped += 1
+                    continue
+                remote_wins = (change.changed_at, batch.node_id) > (local_at, local_node)
+                report.conflicts.append(SyncConflict(table, row_id, local, change.payload, local_at,
+                                                     change.changed_at, "remote" if remote_wins else "local"))
+                if not remote_wins:
+                    continue
+            if change.op == "D":
+                cur.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            else:
+                cur.execute(upserts[table], [change.payload.get(c) for c in CHANGE_LOG_TABLES[table]])
+            report.applied += 1
+            written.add(row_id)
+        cur.execute("UPDATE sync_state SET value = '0' WHERE name = 'applying'")
+        if written and _digested_seq(cur) is not None:
+            # Both tables: deleting a student cascades to the enrollment
+            for table in CHANGE_LOG_TABLES:
+                _store_digests(cur, table, sorted(written))
+        if report.applied or report.rekeyed:
+            # Merged rows bypass change_log; tells the replica to recopy
+            cur.execute("""
+                INSERT INTO sync_state VALUES ('merges', '1')
+                ON CONFLICT(name) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+            """)
+
+        cur.execute("""
+            INSERT INTO sync_peers (node_id, received_seq, acked_seq) VALUES (?, ?, ?)
+            ON CONFLICT(node_id) DO UPDATE SET
+                received_seq = MAX(received_seq, excluded.received_seq),
+                acked_seq = MAX(acked_seq, excluded.acked_seq)
+        """, (batch.node_id, max(batch.last_seq, received), batch.acked_seq))
+        # Keep locally allocated IDs clear of the ones just merged in. IDs at
+        # or above this database's range limit belong to other workstations.
+        _, limit = id_range(ID_TABLE, conn)
+        cur.execute(f"""
+            UPDATE id_sequences SET next_value = MAX(next_value, (
+                SELECT COALESCE(MAX(number), 0) + 1 FROM (
+                    SELECT CAST(substr(id, 2) AS INTEGER) AS number
+                    FROM registered_students WHERE id GLOB '{ID_PREFIX}[0-9]*')
+                WHERE ? IS NULL OR number < ?))
+            WHERE name = ?
+        """, (limit, limit, ID_TABLE))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def prune_change_log(conn: sqlite3.Connection) -> int:
+    # Drop changes every known peer has confirmed; with no peers, all of
+    # them (a new workstation starts from clone_database(), not the log).
+    # The stored digests are caught up first, in the same transaction, as
+    # they are kept current from the log. Returns rows removed.
+    _begin(conn)
+    try:
+        cur = conn.cursor()
+        _refresh_digests(cur)
+        cur.execute("""
+            DELETE FROM change_log WHERE seq <= COALESCE(
+                (SELECT MIN(acked_seq) FROM sync_peers), (SELECT MAX(seq) FROM change_log))
+        """)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return cur.rowcount
+
+
+def _begin(conn: sqlite3.Connection):
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+
+
+# ------------------- Merkle row digests -------------------
+# Each row's digest and each bucket's leaf are stored (sync_row_digests,
+# sync_leaf_digests) and caught up from change_log before they are read, so
+# a comparison only touches the rows changed since the last one. Merged rows
+# are not logged; apply_changes() updates their digests itself.
+
+def _row_digest(values) -> int:
+    text = "\x1f".join("\x00" if v is None else str(v) for v in values)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def _bucket(row_id: str, buckets: int) -> int:
+    return zlib.crc32(row_id.encode("utf-8")) % buckets
+
+
+class MerkleTree:
+    """Binary hash tree over per-bucket row digests of one table.
+
+    A leaf is the XOR of the digests of the rows whose id hashes into that
+    bucket, so it does not depend on row order. Two databases compare roots
+    first and only descend into subtrees whose hashes differ.
+    """
+
+    def __init__(self, leaves: List[int]):
+        self.levels = [[leaf.to_bytes(8, "big", signed=True) for leaf in leaves]]
+        while len(self.levels[-1]) > 1:
+            below = self.levels[-1]
+            self.levels.append([hashlib.blake2b(b"".join(below[i:i + 2]), digest_size=8).digest()
+                                for i in range(0, len(below), 2)])
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def diff(self, other: "MerkleTree") -> List[int]:
+        # Indices of the leaves (buckets) that differ
+        if len(self.levels[0]) != len(other.levels[0]):
+            raise ValueError("Trees were built with different bucket counts")
+        nodes = [0]
+        for depth in range(len(self.levels) - 1, 0, -1):
+            mine, theirs = self.levels[depth], other.levels[depth]
+            nodes = [n for n in nodes if mine[n] != theirs[n]]
+            nodes = [c for n in nodes for c in (2 * n, 2 * n + 1) if c < len(self.levels[depth - 1])]
+        return [n for n in nodes if self.levels[0][n] != other.levels[0][n]]
+
+
+def _digested_seq(cur) -> Optional[int]:
+    # Last change_log seq the stored digests reflect; None before the first build
+    row = cur.execute("SELECT value FROM sync_state WHERE name = 'digest_seq'").fetchone()
+    return int(row[0]) if row else None
+
+
+def _store_digests(cur, table: str, row_ids):
+    # Recompute the stored digests of these rows from their current values;
+    # a row that is gone drops out of its bucket
+    columns = ", ".join(CHANGE_LOG_TABLES[table])
+    changed: Dict[int, int] = {}
+    for row_id in row_ids:
+        bucket = _bucket(row_id, DIGEST_BUCKETS)
+        old = cur.execute("SELECT digest FROM sync_row_digests WHERE tbl = ? AND bucket = ? AND row_id = ?",
+                          (table, bucket, row_id)).fetchone()
+        row = cur.execute(f"SELECT {columns} FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        old = old[0] if old else 0
+        new = _row_digest(row) if row else 0
+        if row:
+            cur.execute("INSERT OR REPLACE INTO sync_row_digests VALUES (?, ?, ?, ?)",
+                        (table, bucket, row_id, new))
+        else:
+            cur.execute("DELETE FROM sync_row_digests WHERE tbl = ? AND bucket = ? AND row_id = ?",
+                        (table, bucket, row_id))
+        if old != new:
+            changed[bucket] = changed.get(bucket, 0) ^ old ^ new
+    for bucket, delta in changed.items():
+        leaf = cur.execute("SELECT digest FROM sync_leaf_digests WHERE tbl = ? AND bucket = ?",
+                           (table, bucket)).fetchone()
+        cur.execute("INSERT OR REPLACE INTO sync_leaf_digests VALUES (?, ?, ?)",
+                    (table, bucket, (leaf[0] if leaf else 0) ^ delta))
+
+
+def _rebuild_digests(cur):
+    cur.execute("DELETE FROM sync_row_digests")
+    cur.execute("DELETE FROM sync_leaf_digests")
+    for table, columns in CHANGE_LOG_TABLES.items():
+        leaves = [0] * DIGEST_BUCKETS
+        rows = []
+        for row in cur.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall():
+            bucket, digest = _bucket(row[0], DIGEST_BUCKETS), _row_digest(row)
+            leaves[bucket] ^= digest
+            rows.append((table, bucket, row[0], digest))
+        cur.executemany("INSERT INTO sync_row_digests VALUES (?, ?, ?, ?)", rows)
+        cur.executemany("INSERT INTO sync_leaf_digests VALUES (?, ?, ?)",
+                        [(table, bucket, leaf) for bucket, leaf in enumerate(leaves) if leaf])
+
+
+def _refresh_digests(cur):
+    # Catch the stored digests up with change_log (inside the caller's
+    # transaction). They are rebuilt from the tables on first use, and when
+    # the log was pruned past the last refresh.
+    done = _digested_seq(cur)
+    row = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    last = row[0] if row else 0
+    if done is not None and done >= last:
+        return
+    oldest = cur.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+    if done is None or oldest is None or oldest > done + 1:
+        _rebuild_digests(cur)
+    else:
+        touched: Dict[str, List[str]] = {}
+        for table, row_id in cur.execute("SELECT DISTINCT tbl, row_id FROM change_log WHERE seq > ?",
+                                         (done,)).fetchall():
+            touched.setdefault(table, []).append(row_id)
+        for table, row_ids in touched.items():
+            _store_digests(cur, table, row_ids)
+    cur.execute("INSERT OR REPLACE INTO sync_state VALUES ('digest_seq', ?)", (str(last),))
+
+
+def refresh_digests(conn: sqlite3.Connection):
+    # Bring the stored digests up to date; cheap when nothing changed
+    _begin(conn)
+    try:
+        _refresh_digests(conn.cursor())
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def digest_tree(conn: sqlite3.Connection, table: str, buckets: int = DIGEST_BUCKETS) -> MerkleTree:
+    leaves = [0] * buckets
+    if buckets != DIGEST_BUCKETS:
+        # Only DIGEST_BUCKETS is stored; other sizes hash every row
+        for row in conn.execute(f"SELECT {', '.join(CHANGE_LOG_TABLES[table])} FROM {table}"):
+            leaves[_bucket(row[0], buckets)] ^= _row_digest(row)
+        return MerkleTree(leaves)
+    refresh_digests(conn)
+    for bucket, digest in conn.execute("SELECT bucket, digest FROM sync_leaf_digests WHERE tbl = ?", (table,)):
+        leaves[bucket] = digest
+    return MerkleTree(leaves)
+
+
+def bucket_digests(conn: sqlite3.Connection, table: str, bucket_ids: List[int],
+                   buckets: int = DIGEST_BUCKETS) -> Dict[str, int]:
+    # row id -> digest for the rows in the given buckets
+    wanted = sorted(set(bucket_ids))
+    if buckets != DIGEST_BUCKETS:
+        return {row[0]: _row_digest(row)
+                for row in conn.execute(f"SELECT {', '.join(CHANGE_LOG_TABLES[table])} FROM {table}")
+                if _bucket(row[0], buckets) in wanted}
+    refresh_digests(conn)
+    result = {}
+    for start in range(0, len(wanted), 500):
+        chunk = wanted[start:start + 500]
+        result.update(conn.execute(
+            f"SELECT row_id, digest FROM sync_row_digests WHERE tbl = ? "
+            f"AND bucket IN ({', '.join('?' for _ in chunk)})", [table] + chunk))
+    return result
+
+
+def find_divergence(conn_a: sqlite3.Connection, conn_b: sqlite3.Connection,
+                    buckets: int = DIGEST_BUCKETS) -> Dict[str, List[str]]:
+    # table -> ids of rows that are missing or different between the two
+    result = {}
+    for table in CHANGE_LOG_TABLES:
+        differing = digest_tree(conn_a, table, buckets).diff(digest_tree(conn_b, table, buckets))
+        if not differing:
+            continue
+        a = bucket_digests(conn_a, table, differing, buckets)
+        b = bucket_digests(conn_b, table, differing, buckets)
+        result[table] = sorted(k for k in a.keys() | b.keys() if a.get(k) != b.get(k))
+    return result
+
+
+def _split_id_range(source: sqlite3.Connection) -> Tuple[int, int]:
+    # Halve the source's remaining ID range: the source keeps the lower half
+    # and the clone gets [start, limit). Every clone splits its parent's
+    # range, so no two workstations can hand out the same id.
+    from app.core.db import ID_SPACE_END, IdRangeExhaustedError, assign_id_range, id_range
+    source.execute("BEGIN IMMEDIATE")
+    try:
+        next_value, limit = id_range(ID_TABLE, source)
+        if limit is None:
+            limit = max(ID_SPACE_END, 2 * next_value)
+        start = next_value + (limit - next_value) // 2
+        if start <= next_value:
+            raise IdRangeExhaustedError("The source database has no IDs left to give a clone")
+        assign_id_range(ID_TABLE, next_value, start, source)
+        source.commit()
+    except BaseException:
+        source.rollback()
+        raise
+    return start, limit
+
+
+def clone_database(source_path: str, dest_path: str):
+    # Seed a new workstation from an existing database file. The copy gets
+    # its own node id, an empty change log and its own slice of the source's
+    # ID range, and starts out having merged everything the source had logged.
+    from app.core.db import assign_id_range, connect
+    source, dest = connect(source_path), connect(dest_path)
+    try:
+        start, limit = _split_id_range(source)
+        source.backup(dest)
+        last_seq = source.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        with dest:
+            dest.execute("UPDATE sync_state SET value = lower(hex(randomblob(8))) WHERE name = 'node_id'")
+            dest.execute("DELETE FROM change_log")
+            dest.execute("DELETE FROM sync_peers")
+            dest.execute("INSERT INTO sync_peers (node_id, received_seq) VALUES (?, ?)",
+                         (node_id(source), last_seq))
+            assign_id_range(ID_TABLE, start, limit, dest)
+        with source:
+            source.execute("INSERT OR REPLACE INTO sync_peers (node_id, acked_seq) VALUES (?, ?)",
+                           (node_id(dest), last_seq))
+    finally:
+        source.close()
+        dest.close()
+
+
+def _merge_reports(report: MergeReport, more: MergeReport):
+    report.received += more.received
+    report.applied += more.applied
+    report.skipped += more.skipped
+    report.conflicts.extend(more.conflicts)
+    report.rekeyed.extend(more.rekeyed)
+    report.held_back.extend(more.held_back)
+    report.seconds += more.seconds
+
+
+def sync_databases(path_a: str, path_b: str) -> Tuple[MergeReport, MergeReport, Dict[str, List[str]]]:
+    # Two-way sync of two database files: swap change batches, merge both,
+    # then confirm with the digest trees. Returns the merge report for each
+    # side (changes merged into a, into b) and any rows still divergent.
+    # Students moved to new ids during the merge go across in a second round.
+    from app.core.db import connect
+    from app.core.migrations import migrate
+    conn_a, conn_b = connect(path_a), connect(path_b)
+    try:
+        migrate(conn_a)
+        migrate(conn_b)
+        to_b = export_changes(conn_a, node_id(conn_b))
+        to_a = export_changes(conn_b, node_id(conn_a))
+        into_a = apply_changes(conn_a, to_a)
+        into_b = apply_changes(conn_b, to_b)
+        if into_a.rekeyed or into_b.rekeyed:
+            _merge_reports(into_a, apply_changes(conn_a, export_changes(conn_b, node_id(conn_a))))
+            _merge_reports(into_b, apply_changes(conn_b, export_changes(conn_a, node_id(conn_b))))
+        return into_a, into_b, find_divergence(conn_a, conn_b)
+    finally:
+        conn_a.close()
+        conn_b.close()
@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPainter, QPen, QFont
 from app.items.service import StudentService
+from app.gui.workers import TaskRunner, change_relay
 from app.styles.dashboard_styles import Colors, Styles, Dimensions, ChartColors
 
 
@@ -333,8 +334,15 @@ class DonutChart(QWidget):
 class DashboardTab(QWidget):
     def __init__(self):
         super().__init__()
+        self.runner = TaskRunner(self)
         self.setup_ui()
         QTimer.singleShot(100, self.load_data)
+        # Reload once per burst of writes rather than once per write
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(250)
+        self.reload_timer.timeout.connect(self.load_data)
+        change_relay().changed.connect(self.on_change)
 
     def setup_ui(self):
         # Apply stylesheet
@@ -399,39 +407,40 @@ class DashboardTab(QWidget):
 
         refresh = QPushButton("Refresh")
         refresh.clicked.connect(self.load_data)
+        self.runner.busy_changed.connect(lambda busy: refresh.setText("Loading…" if busy else "Refresh"))
         refresh.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_layout.addWidget(refresh)
 
         main.addLayout(btn_layout)
 
+    def on_change(self, _event):
+        self.reload_timer.start()
+
     def load_data(self):
-        try:
-            registered = StudentService.list_registered() or []
-            enrolled = StudentService.list_enrolled() or []
+        # Counters are read on a worker thread; show_stats runs on the UI thread
+        self.runner.submit(StudentService.get_enrollment_stats, key="stats",
+                           on_result=self.show_stats,
+                           on_error=lambda e: print(f"Error loading dashboard: {e}"))
 
+    def show_stats(self, stats):
+        try:
             # Update stat cards
-            self.stats["enrolled"].update_value(len(enrolled))
-            self.stats["registered"].update_value(len(registered))
-
-            g11_list = [s for s in enrolled if s.get("grade_level") == "11"]
-            g12_list = [s for s in enrolled if s.get("grade_level") == "12"]
-
-            self.stats["g11"].update_value(len(g11_list))
-            self.stats["g12"].update_value(len(g12_list))
+            self.stats["enrolled"].update_value(stats.enrolled)
+            self.stats["registered"].update_value(stats.registered)
+            self.stats["g11"].update_value(stats.by_grade.get("11", 0))
+            self.stats["g12"].update_value(stats.by_grade.get("12", 0))
 
             # Prepare chart data
             strand_data = {}
             for strand_name in ["STEM", "ICT", "HUMSS", "GAS"]:
-                g11_cnt = sum(1 for s in g11_list if s.get("strand") == strand_name)
-                g12_cnt = sum(1 for s in g12_list if s.get("strand") == strand_name)
                 strand_data[strand_name] = {
-                    "g11": g11_cnt,
-                    "g12": g12_cnt
+                    "g11": stats.count("11", strand_name),
+                    "g12": stats.count("12", strand_name)
                 }
 
             grade_data = {
-                "Grade 11": len(g11_list),
-                "Grade 12": len(g12_list)
+                "Grade 11": stats.by_grade.get("11", 0),
+                "Grade 12": stats.by_grade.get("12", 0)
             }
 
             # Update charts
@@ -439,4 +448,4 @@ class DashboardTab(QWidget):
             self.grade_chart.set_data(grade_data)
 
         except Exception as e:
-            print(f"Error loading dashboard: {e}")
\ No newline at end of file
+            print(f"Error loading dashboard: {e}")
@@ -1,12 +1,18 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
-    QComboBox, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QLineEdit, QGroupBox
+    QComboBox, QPushButton, QTableView,
+    QHeaderView, QMessageBox, QLineEdit, QGroupBox, QFileDialog
 )
 from PyQt6.QtGui import QFont
+from app.items import events
 from app.items.service import StudentService
+from app.gui.service_dialogs import StudentDialogs
+from app.gui.workers import TaskRunner, change_relay
+from app.gui.table_models import EnrolledTableModel
 from app.styles.enrollment_style import get_enrollment_style
 
+EXPORT_FILE_FILTER = "CSV (*.csv);;JSON Lines (*.jsonl);;Excel Workbook (*.xlsx)"
+
 
 class EnrolledTab(QWidget):
     """Tab widget for managing enrolled students"""
@@ -14,6 +20,7 @@ class EnrolledTab(QWidget):
     def __init__(self):
         super().__init__()
         self.setObjectName("EnrolledTab")
+        self.runner = TaskRunner(self)  # all StudentService calls run off the UI thread
         self.init_ui()
         self.apply_style()
         self.load_enrolled()  # Load initial data
@@ -72,6 +79,7 @@ class EnrolledTab(QWidget):
         self.filter_strand.addItems(["All", "STEM", "HUMSS", "GAS", "ICT"])
         self.filter_btn = QPushButton("Filter")
         self.refresh_btn = QPushButton("Refresh")
+        self.export_btn = QPushButton("Export")
 
         filter_layout.addWidget(QLabel("Grade Level:"))
         filter_layout.addWidget(self.filter_grade)
@@ -79,16 +87,22 @@ class EnrolledTab(QWidget):
         filter_layout.addWidget(self.filter_strand)
         filter_layout.addWidget(self.filter_btn)
         filter_layout.addWidget(self.refresh_btn)
+        filter_layout.addWidget(self.export_btn)
 
         # Table for enrolled students
-        self.enrolled_table = QTableWidget()
-        self.enrolled_table.setColumnCount(4)
-        self.enrolled_table.setHorizontalHeaderLabels(["ID", "Full Name", "Grade Level", "Strand"])
+        self.model = EnrolledTableModel(self)
+        self.enrolled_table = QTableView()
+        self.enrolled_table.setModel(self.model)
+        self.enrolled_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.enrolled_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.enrolled_table.setSelectionBehavior(self.enrolled_table.SelectionBehavior.SelectRows)
         self.enrolled_table.setEditTriggers(self.enrolled_table.EditTrigger.NoEditTriggers)
 
+        self.loading_label = QLabel("Loading…")
+        self.loading_label.hide()
+
         right_layout.addLayout(filter_layout)
+        right_layout.addWidget(self.loading_label)
         right_layout.addWidget(self.enrolled_table)
 
         main_layout.addWidget(form_group, 2)
@@ -97,10 +111,14 @@ class EnrolledTab(QWidget):
         # Connect buttons to their methods
         self.filter_btn.clicked.connect(self.on_filter)
         self.refresh_btn.clicked.connect(self.load_enrolled)
+        self.export_btn.clicked.connect(self.on_export)
         self.update_btn.clicked.connect(self.on_update_selected)
         self.delete_enrolled_btn.clicked.connect(self.on_delete_selected)
         self.clear_btn.clicked.connect(self.clear)
-        self.enrolled_table.cellClicked.connect(self.cell_table_clicked)
+        self.enrolled_table.clicked.connect(self.cell_table_clicked)
+        self.runner.busy_changed.connect(self.loading_label.setVisible)
+        # Writes (from any tab) patch the affected rows instead of reloading
+        change_relay().changed.connect(self.on_change)
 
     def apply_style(self):
         """Apply fonts and styles"""
@@ -112,75 +130,105 @@ class EnrolledTab(QWidget):
         self.delete_enrolled_btn.setObjectName("delete_btn")
         self.filter_btn.setObjectName("clear_btn")
         self.refresh_btn.setObjectName("clear_btn")
+        self.export_btn.setObjectName("clear_btn")
         self.clear_btn.setObjectName("clear_btn")
 
     def load_enrolled(self):
         """Load all enrolled students into the table"""
-        rows = StudentService.list_enrolled()
-        self.populate_enrolled(rows)
+        self.filter_grade.setCurrentIndex(0)
+        self.filter_strand.setCurrentIndex(0)
+        self.set_filter("All", "All")
+        self.runner.submit(StudentService.list_enrolled, key="table", on_result=self.populate_enrolled)
 
     def populate_enrolled(self, students):
         """Fill table with student data"""
-        self.enrolled_table.setRowCount(0)
-        for s in students:
-            r = self.enrolled_table.rowCount()
-            self.enrolled_table.insertRow(r)
-            self.enrolled_table.setItem(r, 0, QTableWidgetItem(s["id"]))
-            self.enrolled_table.setItem(r, 1, QTableWidgetItem(s["full_name"]))
-            self.enrolled_table.setItem(r, 2, QTableWidgetItem(s["grade_level"]))
-            self.enrolled_table.setItem(r, 3, QTableWidgetItem(s["strand"]))
+        self.model.set_students(students)
 
     def on_filter(self):
         """Filter table by grade and strand"""
         g = self.filter_grade.currentText()
         s = self.filter_strand.currentText()
-        rows = StudentService.filter_enrolled(g, s)
-        results = []
-        for row in rows:
-            full_name = f"{row['first_name']} {row['middle_name'] or ''} {row['last_name']}".replace("  ", " ").strip()
-            results.append({
-                "id": row["id"],
-                "full_name": full_name,
-                "grade_level": row["grade_level"],
-                "strand": row["strand"]
-            })
-        self.populate_enrolled(results)
+        self.set_filter(g, s)
+        self.runner.submit(StudentService.list_enrolled, g, s, key="table", on_result=self.populate_enrolled)
+
+    def set_filter(self, grade: str, strand: str):
+        """Remember the filter the table shows so change events honour it"""
+        self.filter = (grade, strand)
+        if grade == "All" and strand == "All":
+            self.model.accepts = None
+        else:
+            self.model.accepts = lambda row: ((grade == "All" or row[2] == grade)
+                                              and (strand == "All" or row[3] == strand))
+
+    def on_change(self, event):
+        """Patch the rows a write touched; selection and scroll stay put"""
+        if event.kind == events.RESET:
+            if event.table == events.ENROLLED:
+                g, s = self.filter
+                self.runner.submit(StudentService.list_enrolled, g, s, key="table",
+                                   on_result=self.populate_enrolled)
+        elif event.table == events.REGISTERED:
+            # Only a name change shows here
+            current = self.model.row_for(event.id) if event.kind == events.UPDATE else None
+            if current is not None:
+                self.model.upsert((current[0], event.row.full_name) + current[2:])
+        elif event.kind == events.DELETE:
+            self.model.remove_key(event.id)
+        else:
+            self.model.upsert(event.row)
+
+    def on_export(self):
+        """Export the roster for the grade/strand filter the table shows"""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Enrolled Students", "enrolled_students.csv",
+                                              EXPORT_FILE_FILTER)
+        if path:
+            g, s = self.filter
+            self.runner.submit(StudentService.export_enrolled, path, g, s,
+                               on_result=lambda result: StudentDialogs.exported(self, result, path))
 
     def on_update_selected(self):
         """Update selected enrollment"""
-        row = self.enrolled_table.currentRow()
-        if row == -1:
+        selected = self.selected_row()
+        if selected is None:
             QMessageBox.warning(self, "Select", "Select student to update.")
             return
-        eid = self.enrolled_table.item(row, 0).text()
+        eid = selected[0]
         grade = self.grade_level.currentText()
         strand = self.strand.currentText()
-        success = StudentService.update_enrollment(eid, grade, strand, self)
-        if success:
-            self.load_enrolled()
+        self.runner.submit(StudentService.change_enrollment, eid, grade, strand, on_result=self.on_updated)
+
+    def on_updated(self, result):
+        if StudentDialogs.enrollment_updated(self, result):
             self.clear()
-        else:
-            QMessageBox.warning(self, "Error", f"No enrollment found with ID {eid}.")
 
     def on_delete_selected(self):
         """Delete selected enrollment"""
-        row = self.enrolled_table.currentRow()
-        if row == -1:
+        selected = self.selected_row()
+        if selected is None:
             QMessageBox.warning(self, "Select", "Select student to drop.")
             return
-        eid = self.enrolled_table.item(row, 0).text()
+        eid = selected[0]
         ok = QMessageBox.question(self, "Confirm", "Are you sure to drop this student?")
         if ok == QMessageBox.StandardButton.Yes:
-            StudentService.delete_enrolled(eid, self)
-            self.load_enrolled()
-            self.clear()
+            self.runner.submit(StudentService.drop, eid, on_result=self.on_dropped)
+
+    def on_dropped(self, result):
+        StudentDialogs.dropped(self, result)
+        self.clear()
 
-    def cell_table_clicked(self, row, col):
+    def selected_row(self):
+        """(id, full_name, grade_level, strand) of the current row, or None"""
+        index = self.enrolled_table.currentIndex()
+        return self.model.row_at(index.row()) if index.isValid() else None
+
+    def cell_table_clicked(self, index):
         """Populate form fields when table row is clicked"""
-        self.id.setText(self.enrolled_table.item(row, 0).text())
-        self.name.setText(self.enrolled_table.item(row, 1).text())
-        grade = self.enrolled_table.item(row, 2).text()
-        strand = self.enrolled_table.item(row, 3).text()
+        selected = self.model.row_at(index.row())
+        if selected is None:
+            return
+        sid, full_name, grade, strand = selected
+        self.id.setText(sid)
+        self.name.setText(full_name)
         idx_g = self.grade_level.findText(grade)
         if idx_g >= 0:
             self.grade_level.setCurrentIndex(idx_g)
@@ -194,12 +242,3 @@ class EnrolledTab(QWidget):
         self.name.clear()
         self.grade_level.setCurrentIndex(0)
         self.strand.setCurrentIndex(0)
-
-    def add_student_to_table(self, student_data: dict):
-        """Add a single student to the table"""
-        row = self.enrolled_table.rowCount()
-        self.enrolled_table.insertRow(row)
-        self.enrolled_table.setItem(row, 0, QTableWidgetItem(str(student_data.get("student_id", ""))))
-        self.enrolled_table.setItem(row, 1, QTableWidgetItem(student_data.get("full_name", "")))
-        self.enrolled_table.setItem(row, 2, QTableWidgetItem(student_data.get("grade_level", "")))
-        self.enrolled_table.setItem(row, 3, QTableWidgetItem(student_data.get("strand", "")))
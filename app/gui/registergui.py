@@ -1,23 +1,29 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
-    QLineEdit, QComboBox, QDateEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QHeaderView, QMessageBox, QDialog, QGridLayout, QGroupBox
+    QLineEdit, QComboBox, QDateEdit, QPushButton, QTableView,
+    QHeaderView, QMessageBox, QDialog, QGridLayout, QGroupBox, QFileDialog
 )
-from PyQt6.QtCore import QDate, pyqtSignal, QRegularExpression
+from PyQt6.QtCore import QDate, QRegularExpression
 from PyQt6.QtGui import QRegularExpressionValidator, QFont
 from app.items.models import RegisteredStudent, EnrolledStudent
+from app.items import events
 from app.items.service import StudentService
+from app.items.validation import PHONE_INPUT_PATTERN
 from app.gui.enrollment_dialog import EnrollmentDialog
+from app.gui.enrollmentgui import EXPORT_FILE_FILTER
+from app.gui.service_dialogs import StudentDialogs
+from app.gui.workers import TaskRunner, change_relay
+from app.gui.table_models import RegisteredTableModel
 from app.styles.register_style import get_register_style
 
 
 class RegistrationTab(QWidget):
-    student_enrolled = pyqtSignal(dict)
-
     def __init__(self):
         super().__init__()
         self.id_hidden = None
+        self.query = ""  # search the table currently shows ("" = everyone)
         self.setObjectName("RegistrationTab")  # Important for targeted styling
+        self.runner = TaskRunner(self)  # all StudentService calls run off the UI thread
         self.init_ui()
         self.apply_style()
         self.load_registered_students()
@@ -64,7 +70,7 @@ class RegistrationTab(QWidget):
         self.guardian_contact = QLineEdit()
 
         # Validation for Philippine mobile numbers
-        regex = QRegularExpression(r"^(09\d{0,9}|\+639\d{0,9})$")
+        regex = QRegularExpression(PHONE_INPUT_PATTERN)
         validator = QRegularExpressionValidator(regex)
         self.contact.setValidator(validator)
         self.guardian_contact.setValidator(validator)
@@ -113,28 +119,32 @@ class RegistrationTab(QWidget):
         self.search_input.setPlaceholderText("Search by Name or ID...")
         self.search_btn = QPushButton("Search")
         self.refresh_btn = QPushButton("Refresh")
+        self.export_btn = QPushButton("Export")
 
         search_layout.addWidget(QLabel("Search:"))
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(self.search_btn)
         search_layout.addWidget(self.refresh_btn)
+        search_layout.addWidget(self.export_btn)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Full Name", "Gender",
-            "Birth Date", "Age", "Contact",
-            "Guardian Name", "Guardian Contact", "Status"
-        ])
+        # Model/view table: rows are fetched into the view as it scrolls
+        self.model = RegisteredTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
-        self.table.cellClicked.connect(self.on_table_cell_clicked)
+        self.table.clicked.connect(self.on_table_cell_clicked)
 
         self.enroll_btn = QPushButton("Enroll Selected Student")
         self.enroll_btn.clicked.connect(self.enroll_student)
 
+        self.loading_label = QLabel("Loading…")
+        self.loading_label.hide()
+
         right_layout.addLayout(search_layout)
+        right_layout.addWidget(self.loading_label)
         right_layout.addWidget(self.table)
         right_layout.addWidget(self.enroll_btn)
 
@@ -149,7 +159,11 @@ class RegistrationTab(QWidget):
         self.delete_btn.clicked.connect(self.on_delete)
         self.refresh_btn.clicked.connect(self.load_registered_students)
         self.search_btn.clicked.connect(self.on_search)
+        self.export_btn.clicked.connect(self.on_export)
         self.birth_date.dateChanged.connect(self.on_birthdate_changed)
+        self.runner.busy_changed.connect(self.loading_label.setVisible)
+        # Writes (from any tab) patch the affected rows instead of reloading
+        change_relay().changed.connect(self.on_change)
 
     # --- Apply Style ---
     def apply_style(self):
@@ -197,21 +211,35 @@ class RegistrationTab(QWidget):
         self.age.setText(str(age) if age is not None else "")
 
     def on_register(self):
-        student = self.collect_form_data()
-        sid = StudentService.register_student(student, self)
-        if sid:
-            self.load_registered_students()
+        self.register_btn.setEnabled(False)
+        self.runner.submit(StudentService.register, self.collect_form_data(),
+                           on_result=self.on_registered, on_error=self.on_register_failed)
+
+    def on_registered(self, result):
+        self.register_btn.setEnabled(True)
+        if StudentDialogs.registered(self, result):
             self.clear_form()
 
+    def on_register_failed(self, error):
+        self.register_btn.setEnabled(True)
+        self.runner.report_error(error)
+
     def on_update(self):
         if not self.id_hidden:
             QMessageBox.warning(self, "Select", "Please select a student row to update.")
             return
-        student = self.collect_form_data()
-        success =StudentService.update_registered(student, self)
-        if success:
+        self.update_btn.setEnabled(False)
+        self.runner.submit(StudentService.update, self.collect_form_data(),
+                           on_result=self.on_updated, on_error=self.on_update_failed)
+
+    def on_updated(self, result):
+        self.update_btn.setEnabled(True)
+        if StudentDialogs.updated(self, result):
             self.clear_form()
-            self.load_registered_students()
+
+    def on_update_failed(self, error):
+        self.update_btn.setEnabled(True)
+        self.runner.report_error(error)
 
     def on_delete(self):
         if not self.id_hidden:
@@ -219,49 +247,54 @@ class RegistrationTab(QWidget):
             return
         ok = QMessageBox.question(self, "Confirm", "Are you sure you want to delete this student information?")
         if ok == QMessageBox.StandardButton.Yes:
-            StudentService.delete_registered(self.id_hidden, self)
-            self.clear_form()
-            self.load_registered_students()
+            self.runner.submit(StudentService.delete, self.id_hidden, on_result=self.on_deleted)
+
+    def on_deleted(self, result):
+        StudentDialogs.deleted(self, result)
+        self.clear_form()
 
     def on_search(self):
         q = self.search_input.text().strip()
-        if not q:
-            self.load_registered_students()
-            return
-        students = StudentService.search_registered(q)
-        self.populate_table_with_registered(students)
+        self.query = q
+        # A newer search or refresh supersedes any that is still running
+        self.runner.submit(_fetch_registered, q, key="table",
+                           on_result=self.populate_table_with_registered)
+
+    def on_export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Registered Students", "registered_students.csv",
+                                              EXPORT_FILE_FILTER)
+        if path:
+            self.runner.submit(StudentService.export_registered, path,
+                               on_result=lambda result: StudentDialogs.exported(self, result, path))
 
     def load_registered_students(self):
-        students = StudentService.list_registered()
-        self.populate_table_with_registered(students)
+        self.query = ""
+        self.runner.submit(_fetch_registered, "", key="table",
+                           on_result=self.populate_table_with_registered)
 
     def populate_table_with_registered(self, students):
-        self.table.setRowCount(0)
-
-        # Fetch enrolled IDs for quick lookup
-        enrolled_list = StudentService.list_enrolled()
-        enrolled_ids = {e["id"] for e in enrolled_list}
-
-        for s in students:
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-
-            full_name = f"{s.first_name} {s.middle_name or ''} {s.last_name}".replace("  ", " ").strip()
-            status = "Enrolled" if s.id in enrolled_ids else "Unenrolled"
-
-            self.table.setItem(r, 0, QTableWidgetItem(str(s.id)))
-            self.table.setItem(r, 1, QTableWidgetItem(full_name))
-            self.table.setItem(r, 2, QTableWidgetItem(s.gender or ""))
-            self.table.setItem(r, 3, QTableWidgetItem(s.birth_date or ""))
-            self.table.setItem(r, 4, QTableWidgetItem(str(s.age) if s.age else ""))
-            self.table.setItem(r, 5, QTableWidgetItem(s.contact or ""))
-            self.table.setItem(r, 6, QTableWidgetItem(s.guardian_name or ""))
-            self.table.setItem(r, 7, QTableWidgetItem(s.guardian_contact or ""))
-            self.table.setItem(r, 8, QTableWidgetItem(status))
-
-    def on_table_cell_clicked(self, row, col):
-        sid = self.table.item(row, 0).text()
-        student = StudentService.get_registered(sid)
+        self.model.set_students(students)
+
+    def on_change(self, event):
+        # Patch the rows a write touched; selection and scroll stay put
+        if event.kind == events.RESET:
+            self.runner.submit(_fetch_registered, self.query, key="table",
+                               on_result=self.populate_table_with_registered)
+        elif event.table == events.ENROLLED:
+            placement = event.row[2:] if event.row is not None else ()
+            self.model.set_status(event.id, *placement)
+        elif event.kind == events.DELETE:
+            self.model.remove_key(event.id)
+        else:
+            # While a search is shown, new students are not added to it
+            self.model.upsert_student(event.row, insert=not self.query)
+
+    def on_table_cell_clicked(self, index):
+        s = self.model.row_at(index.row())
+        if s is not None:
+            self.runner.submit(StudentService.get_registered, s.id, key="detail", on_result=self.fill_form)
+
+    def fill_form(self, student):
         if student:
             self.id_hidden = student.id
             self.first_name.setText(student.first_name or "")
@@ -279,22 +312,25 @@ class RegistrationTab(QWidget):
             self.guardian_contact.setText(student.guardian_contact or "")
 
     def enroll_student(self):
-        row = self.table.currentRow()
-        if row == -1:
+        index = self.table.currentIndex()
+        s = self.model.row_at(index.row()) if index.isValid() else None
+        if s is None:
             QMessageBox.warning(self, "No Selection", "Please select a student to enroll.")
             return
 
         dialog = EnrollmentDialog()
         if dialog.exec() == QDialog.DialogCode.Accepted:
             grade_level, strand = dialog.get_values()
-            sid = self.table.item(row, 0).text()
-            enrollment = EnrolledStudent(id=sid, grade_level=grade_level, strand=strand)
-            StudentService.enroll_student(enrollment, self)
-            self.student_enrolled.emit({
-                "student_id": sid,
-                "full_name": self.table.item(row, 1).text(),
-                "grade_level": grade_level,
-                "strand": strand
-            })
+            enrollment = EnrolledStudent(id=s.id, grade_level=grade_level, strand=strand)
+            self.runner.submit(StudentService.enroll, enrollment, on_result=self.on_enrolled)
+
+    def on_enrolled(self, result):
+        if StudentDialogs.enrolled(self, result):
             self.clear_form()
-            self.load_registered_students()  # refresh table to update status
+
+
+def _fetch_registered(query: str):
+    # Runs on a worker thread: one query returns the students and their status
+    if query:
+        return StudentService.search_registered_status(query)
+    return StudentService.list_registered_status()
@@ -0,0 +1,67 @@
+from PyQt6.QtWidgets import QMessageBox
+from app.items.results import Result, ServiceError, VALIDATION, BLOCKED, NOT_FOUND
+
+
+def show_error(parent, error: ServiceError):
+    # Problems with the input are warnings; failures are critical
+    if error.kind in (VALIDATION, BLOCKED, NOT_FOUND):
+        QMessageBox.warning(parent, error.title, error.message)
+    else:
+        QMessageBox.critical(parent, error.title, error.message)
+
+
+def _report(result: Result, parent, title: str, message: str) -> bool:
+    if result.ok:
+        QMessageBox.information(parent, title, message)
+    else:
+        show_error(parent, result.error)
+    return result.ok
+
+
+class StudentDialogs:
+    """The message boxes the desktop app shows for StudentService results.
+
+    Tabs run the Result-returning operations (register, update, delete,
+    enroll, change_enrollment, drop, export_*) on a worker and hand the
+    outcome here on the UI thread. Each returns whether the operation
+    succeeded; the error's kind picks the dialog.
+    """
+
+    @classmethod
+    def registered(cls, parent, result: Result[str]) -> bool:
+        return _report(result, parent, "Success", "Student registered successfully!")
+
+    @classmethod
+    def updated(cls, parent, result: Result[bool]) -> bool:
+        return _report(result, parent, "Success", "Student information updated successfully!")
+
+    @classmethod
+    def deleted(cls, parent, result: Result[bool]) -> bool:
+        # A student that was already gone is not worth a dialog
+        if not result.ok:
+            show_error(parent, result.error)
+            return False
+        if result.value:
+            QMessageBox.information(parent, "Deleted", "Student information deleted successfully!")
+        return result.value
+
+    @classmethod
+    def enrolled(cls, parent, result: Result[str]) -> bool:
+        return _report(result, parent, "Success", "Student successfully enrolled!")
+
+    @classmethod
+    def enrollment_updated(cls, parent, result: Result[bool]) -> bool:
+        return _report(result, parent, "Updated", "Student updated successfully!")
+
+    @classmethod
+    def dropped(cls, parent, result: Result[bool]) -> bool:
+        return _report(result, parent, "Student dropped", "Student record dropped successfully!")
+
+    @classmethod
+    def exported(cls, parent, result: Result[int], path: str) -> bool:
+        return _report(result, parent, "Export", f"Exported {result.value} students to {path}")
+
+    @classmethod
+    def failed(cls, parent, error: Exception):
+        # A background task raised instead of returning a Result
+        QMessageBox.critical(parent, "Error", f"The operation failed:\n{error}")
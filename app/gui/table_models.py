@@ -0,0 +1,221 @@
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from app.items.models import RegisteredRow, RegisteredStatusRow
+
+# Rows handed to the view per fetchMore() call
+FETCH_BATCH_SIZE = 200
+
+Column = Tuple[str, Callable[[Any], Any]]
+
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only table model over a list of compact rows (tuples).
+
+    The model keeps every row but exposes them to the view in batches via
+    canFetchMore()/fetchMore(), so the view only lays out what has been
+    scrolled to. Cell text is produced in data() for painted cells only;
+    no per-cell objects are kept.
+
+    Rows are keyed by their first field. upsert() and remove_key() patch one
+    row with a single insert/remove/dataChanged notification, so the view
+    keeps its selection and scroll position. Each key keeps the slot it was
+    given when added; a Fenwick tree counts the removed slots before it, so
+    finding or removing a row costs O(log n) however many rows were removed.
+    """
+
+    def __init__(self, columns: Sequence[Column], parent=None, batch_size: int = FETCH_BATCH_SIZE):
+        super().__init__(parent)
+        self.headers = [header for header, _ in columns]
+        self.getters = [getter for _, getter in columns]
+        self.batch_size = batch_size
+        self._rows: List[tuple] = []
+        self._loaded = 0
+        self._slots: Dict[Any, int] = {}
+        self._removed = [0]     # Fenwick tree over slots (1-based): 1 = removed
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        value = self.getters[index.column()](self._rows[index.row()])
+        return "" if value is None else str(value)
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        end = min(len(self._rows), self._loaded + self.batch_size)
+        if end <= self._loaded:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, end - 1)
+        self._loaded = end
+        self.endInsertRows()
+
+    # --- Row access ---
+    def set_rows(self, rows: Sequence[tuple]):
+        # Replace the contents; the view pulls the first batch on reset
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._loaded = min(len(self._rows), self.batch_size)
+        self._slots = {row[0]: i for i, row in enumerate(self._rows)}
+        self._removed = [0] * (len(self._rows) + 1)
+        self.endResetModel()
+
+    def row_at(self, row: int) -> Optional[tuple]:
+        return self._rows[row] if 0 <= row < self._loaded else None
+
+    def append_row(self, row: tuple):
+        # New rows go after everything already fetched, even rows the view
+        # has not pulled yet
+        position = len(self._rows)
+        self._rows.append(row)
+        self._add_slot(row[0])
+        if self._loaded == position:
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._loaded += 1
+            self.endInsertRows()
+
+    def replace_row(self, row: int, value: tuple):
+        self._rows[row] = value
+        if row < self._loaded:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+    def total_rows(self) -> int:
+        return len(self._rows)
+
+    def position(self, key) -> Optional[int]:
+        slot = self._slots.get(key)
+        return None if slot is None else slot - self._removed_before(slot)
+
+    def row_for(self, key) -> Optional[tuple]:
+        pos = self.position(key)
+        return None if pos is None else self._rows[pos]
+
+    def upsert(self, row: tuple, insert: bool = True) -> bool:
+        # Replace the row with the same key, or append it (when `insert`)
+        pos = self.position(row[0])
+        if pos is not None:
+            self.replace_row(pos, row)
+            return True
+        if insert:
+            self.append_row(row)
+            return True
+        return False
+
+    def remove_key(self, key) -> bool:
+        pos = self.position(key)
+        if pos is None:
+            return False
+        if pos < self._loaded:
+            self.beginRemoveRows(QModelIndex(), pos, pos)
+            del self._rows[pos]
+            self._loaded -= 1
+            self.endRemoveRows()
+        else:
+            del self._rows[pos]
+        slot = self._slots.pop(key)
+        i = slot + 1
+        while i < len(self._removed):
+            self._removed[i] += 1
+            i += i & -i
+        return True
+
+    # --- Slot bookkeeping ---
+    def _removed_before(self, slot: int) -> int:
+        # Removed slots among 0..slot-1
+        total = 0
+        while slot > 0:
+            total += self._removed[slot]
+            slot -= slot & -slot
+        return total
+
+    def _add_slot(self, key):
+        # New last slot; its tree node covers the slots below it that its
+        # lowest set bit spans
+        n = len(self._removed)
+        self._removed.append(self._removed_before(n - 1) - self._removed_before(n - (n & -n)))
+        self._slots[key] = n - 1
+
+
+def _full_name(first: str, middle: Optional[str], last: str) -> str:
+    return f"{first} {middle or ''} {last}".replace("  ", " ").strip()
+
+
+class RegisteredTableModel(RowTableModel):
+    """Registered students as RegisteredStatusRow tuples (status comes with the row)."""
+
+    STATUS_COLUMN = 8
+
+    def __init__(self, parent=None):
+        super().__init__([
+            ("ID", attrgetter("id")),
+            ("Full Name", lambda s: _full_name(s.first_name, s.middle_name, s.last_name)),
+            ("Gender", attrgetter("gender")),
+            ("Birth Date", attrgetter("birth_date")),
+            ("Age", lambda s: s.age or None),
+            ("Contact", attrgetter("contact")),
+            ("Guardian Name", attrgetter("guardian_name")),
+            ("Guardian Contact", attrgetter("guardian_contact")),
+            ("Status", lambda s: "Unenrolled" if s.grade_level is None else "Enrolled"),
+        ], parent)
+
+    def set_students(self, students: Sequence[RegisteredStatusRow]):
+        self.set_rows(students)
+
+    def upsert_student(self, student: RegisteredRow, insert: bool = True) -> bool:
+        # Registration details changed; the placement is kept from the shown row
+        current = self.row_for(student.id)
+        placement = (current.grade_level, current.strand) if current is not None else (None, None)
+        return self.upsert(RegisteredStatusRow.from_row(student, *placement), insert)
+
+    def set_status(self, sid: str, grade_level: Optional[str] = None, strand: Optional[str] = None):
+        # One student's enrollment changed: repaint only their status cell
+        pos = self.position(sid)
+        if pos is None:
+            return
+        self._rows[pos] = self._rows[pos]._replace(grade_level=grade_level, strand=strand)
+        if pos < self._loaded:
+            cell = self.index(pos, self.STATUS_COLUMN)
+            self.dataChanged.emit(cell, cell)
+
+
+# (id, full_name, grade_level, strand)
+enrolled_row = itemgetter("id", "full_name", "grade_level", "strand")
+
+
+class EnrolledTableModel(RowTableModel):
+    """Enrolled students as (id, full_name, grade_level, strand) tuples."""
+
+    def __init__(self, parent=None):
+        # Rows outside the tab's grade/strand filter are left out of upserts
+        self.accepts: Optional[Callable[[tuple], bool]] = None
+        super().__init__([
+            ("ID", itemgetter(0)),
+            ("Full Name", itemgetter(1)),
+            ("Grade Level", itemgetter(2)),
+            ("Strand", itemgetter(3)),
+        ], parent)
+
+    def set_students(self, students):
+        # Accepts the service's enrolled dicts
+        self.set_rows(list(map(enrolled_row, students)))
+
+    def upsert(self, row: tuple, insert: bool = True) -> bool:
+        # A row that no longer matches the filter leaves the table
+        if self.accepts is not None and not self.accepts(row):
+            return self.remove_key(row[0])
+        return super().upsert(row, insert)
@@ -0,0 +1,148 @@
+import logging
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QWidget
+from app.items.events import change_bus
+from app.gui.service_dialogs import StudentDialogs
+
+log = logging.getLogger("app.gui")
+
+_pool = None
+_relay = None
+
+
+def database_pool() -> QThreadPool:
+    # Dedicated pool for repository work. Threads never expire so each keeps
+    # its pooled SQLite connection (app.core.db is per-thread) alive.
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(3)
+        _pool.setExpiryTimeout(-1)
+    return _pool
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class _Task(QRunnable):
+    """Runs one callable on a pool thread and reports back through signals."""
+
+    def __init__(self, fn, args, kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        # The runner holds the reference until the result is delivered, so
+        # Qt must not delete the runnable behind Python's back
+        self.setAutoDelete(False)
+        # Created on the UI thread, so emits from the pool thread are queued
+        # back to the UI thread's event loop
+        self.signals = _TaskSignals()
+
+    def run(self):
+        if self.cancelled:
+            # Still signal so the runner stops counting it as busy
+            self.signals.finished.emit(None)
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """Submits StudentService calls to the database pool for one widget.
+
+    Callbacks always run on the UI thread. Submitting with a `key` cancels
+    the previous task with the same key: it is pulled from the queue if it
+    has not started, and its result is dropped if it has. Without an
+    `on_error`, a task that raises is logged and reported to the user.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, pool: QThreadPool = None):
+        super().__init__(parent)
+        self.pool = pool or database_pool()
+        self._latest = {}
+        self._active = set()
+
+    def submit(self, fn, *args, key=None, on_result=None, on_error=None, **kwargs) -> _Task:
+        if key is not None:
+            self.cancel(key)
+        task = _Task(fn, args, kwargs)
+        task.signals.finished.connect(lambda result, t=task: self._done(t, on_result, result))
+        task.signals.failed.connect(lambda error, t=task: self._done(t, on_error or self.report_error, error))
+        if key is not None:
+            self._latest[key] = task
+        self._track(task)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        task = self._latest.pop(key, None)
+        if task is None:
+            return
+        task.cancelled = True
+        if self.pool.tryTake(task):
+            # Never started, so it will never signal
+            self._untrack(task)
+
+    def report_error(self, error: Exception):
+        # Log the failure and show it over the widget that owns the runner
+        log.error("Background task failed", exc_info=error)
+        parent = self.parent()
+        if isinstance(parent, QWidget):
+            StudentDialogs.failed(parent, error)
+
+    def is_busy(self) -> bool:
+        return bool(self._active)
+
+    def _done(self, task, callback, value):
+        self._untrack(task)
+        for key, latest in list(self._latest.items()):
+            if latest is task:
+                del self._latest[key]
+        if not task.cancelled and callback:
+            callback(value)
+
+    def _track(self, task):
+        self._active.add(task)
+        if len(self._active) == 1:
+            self.busy_changed.emit(True)
+
+    def _untrack(self, task):
+        if task in self._active:
+            self._active.discard(task)
+            if not self._active:
+                self.busy_changed.emit(False)
+
+
+class ChangeRelay(QObject):
+    """Re-emits service change events on the UI thread.
+
+    The change bus calls back on whichever thread made the write; emitting
+    a signal from there queues delivery to the UI thread's event loop.
+    """
+
+    changed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._unsubscribe = change_bus.subscribe(self.changed.emit)
+
+    def close(self):
+        self._unsubscribe()
+
+
+def change_relay() -> ChangeRelay:
+    # Shared relay; create it on the UI thread (first widget to connect)
+    global _relay
+    if _relay is None:
+        _relay = ChangeRelay()
+    return _relay
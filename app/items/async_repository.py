@@ -0,0 +1,154 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from app.items.models import RegisteredStudent, RegisteredRow, EnrolledStudent, EnrollmentStats, Page
+from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo, StatsRepo, PAGE_SIZE
+
+
+class AsyncDatabase:
+    """Bounded executor that runs blocking repository calls for asyncio code.
+
+    Each executor thread keeps its own pooled SQLite connection (see
+    app.core.db.get_connection), so reads run in parallel under WAL.
+    `max_concurrency` caps how many calls may be queued or running at once;
+    extra callers wait on the event loop instead of piling up threads.
+    """
+
+    def __init__(self, max_workers: int = 4, max_concurrency: int = 64):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite-async")
+        self._limit = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, fn, *args):
+        # Cancelling the awaiting task also cancels the call if it has not started
+        async with self._limit:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    def close(self):
+        # Blocks until running calls finish; from a coroutine use aclose()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def aclose(self):
+        # Waits for running calls on a helper thread, so the loop keeps running
+        await asyncio.to_thread(self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class AsyncRegisteredStudentRepo:
+    """Async mirror of RegisteredStudentRepo.
+
+    Concurrent get() calls made in the same loop iteration are answered by
+    a single batched SELECT ... WHERE id IN (...).
+    """
+
+    def __init__(self, database: AsyncDatabase, max_batch: int = 500):
+        self.db = database
+        self.max_batch = max_batch
+        self._waiting: Dict[str, List[asyncio.Future]] = {}
+        self._flush_scheduled = False
+        # The loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def add(self, student: RegisteredStudent) -> str:
+        return await self.db.run(RegisteredStudentRepo.add, student)
+
+    async def add_many(self, students: List[RegisteredStudent]) -> List[str]:
+        return await self.db.run(RegisteredStudentRepo.add_many, students)
+
+    async def get_all(self) -> List[RegisteredStudent]:
+        return await self.db.run(RegisteredStudentRepo.get_all)
+
+    async def get_rows(self) -> List[RegisteredRow]:
+        return await self.db.run(RegisteredStudentRepo.get_rows)
+
+    async def get(self, sid: str) -> Optional[RegisteredStudent]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._waiting.setdefault(sid, []).append(fut)
+        if len(self._waiting) >= self.max_batch:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await fut
+
+    async def get_many(self, sids: List[str]) -> Dict[str, RegisteredStudent]:
+        return await self.db.run(RegisteredStudentRepo.get_many, sids)
+
+    async def update(self, sid: str, student: RegisteredStudent) -> bool:
+        return await self.db.run(RegisteredStudentRepo.update, sid, student)
+
+    async def delete(self, sid: str) -> bool:
+        return await self.db.run(RegisteredStudentRepo.delete, sid)
+
+    async def search(self, query: str, limit: Optional[int] = None) -> List[RegisteredStudent]:
+        return await self.db.run(RegisteredStudentRepo.search, query, limit)
+
+    async def get_page(self, after_key: Optional[str] = None, limit: int = PAGE_SIZE,
+                       order_by: str = "id") -> Page:
+        return await self.db.run(RegisteredStudentRepo.get_page, after_key, limit, order_by)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._waiting:
+            return
+        waiting, self._waiting = self._waiting, {}
+        task = asyncio.get_running_loop().create_task(self._resolve(waiting))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, waiting: Dict[str, List[asyncio.Future]]):
+        # Skip the query entirely if every caller has been cancelled
+        if all(f.done() for futs in waiting.values() for f in futs):
+            return
+        try:
+            found = await self.db.run(RegisteredStudentRepo.get_many, list(waiting))
+        except Exception as e:
+            for futs in waiting.values():
+                for f in futs:
+                    if not f.done():
+                        f.set_exception(e)
+            return
+        except asyncio.CancelledError:
+            for futs in waiting.values():
+                for f in futs:
+                    f.cancel()
+            raise
+        for sid, futs in waiting.items():
+            for f in futs:
+                if not f.done():
+                    f.set_result(found.get(sid))
+
+
+class AsyncEnrolledStudentRepo:
+    """Async mirror of EnrolledStudentRepo."""
+
+    def __init__(self, database: AsyncDatabase):
+        self.db = database
+
+    async def enroll(self, enrollment: EnrolledStudent) -> str:
+        return await self.db.run(EnrolledStudentRepo.enroll, enrollment)
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        return await self.db.run(EnrolledStudentRepo.get_all)
+
+    async def update(self, eid: str, grade: str, strand: str) -> bool:
+        return await self.db.run(EnrolledStudentRepo.update, eid, grade, strand)
+
+    async def delete(self, eid: str) -> bool:
+        return await self.db.run(EnrolledStudentRepo.delete, eid)
+
+    async def filter(self, grade_level: str = None, strand: str = None):
+        return await self.db.run(EnrolledStudentRepo.filter, grade_level, strand)
+
+    async def get_page(self, after_key: Optional[str] = None, limit: int = PAGE_SIZE, order_by: str = "id",
+                       grade_level: str = None, strand: str = None) -> Page:
+        return await self.db.run(EnrolledStudentRepo.get_page, after_key, limit, order_by, grade_level, strand)
+
+    async def get_stats(self) -> EnrollmentStats:
+        return await self.db.run(StatsRepo.get_stats)
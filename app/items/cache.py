@@ -0,0 +1,187 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Hashable, NamedTuple, Optional
+from app.core import db
+from app.items.models import RegisteredStudent
+from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo
+
+_MISSING = object()
+ENROLLED_IDS = "enrolled_ids"
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expired: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """Thread-safe LRU map with an optional time-to-live per entry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expired += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, self.expired, len(self._data))
+
+
+class StudentCache:
+    """Read-through cache for single-student lookups and the enrolled ID set.
+
+    StudentService invalidates entries as it writes. Writes from other
+    connections or processes are caught by watching PRAGMA data_version:
+    when it moves, the rows named in change_log since the last check are
+    dropped. Merged sync batches are not logged, so they clear the cache.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = 300.0):
+        self.entries = LRUCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._watcher = None
+        self._generation = None
+        self._version = None
+        self._last_seq = None
+        self._merged = None
+
+    def get_registered(self, sid: str) -> Optional[RegisteredStudent]:
+        self._check_external_writes()
+        key = ("registered", sid)
+        student = self.entries.get(key)
+        if student is _MISSING:
+            epoch = self._epoch
+            student = RegisteredStudentRepo.get(sid)
+            self._put(key, student, epoch)
+        return student
+
+    def enrolled_ids(self) -> FrozenSet[str]:
+        self._check_external_writes()
+        ids = self.entries.get(ENROLLED_IDS)
+        if ids is _MISSING:
+            epoch = self._epoch
+            ids = frozenset(e["id"] for e in EnrolledStudentRepo.iter_all())
+            self._put(ENROLLED_IDS, ids, epoch)
+        return ids
+
+    def invalidate_registered(self, sid: str):
+        # Deleting a student cascades to their enrollment
+        with self._lock:
+            self._epoch += 1
+            self.entries.pop(("registered", sid))
+            self.entries.pop(ENROLLED_IDS)
+
+    def invalidate_enrolled(self):
+        with self._lock:
+            self._epoch += 1
+            self.entries.pop(ENROLLED_IDS)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self.entries.clear()
+
+    def stats(self) -> CacheStats:
+        return self.entries.stats()
+
+    def _put(self, key, value, epoch: int):
+        # Skip the store if an invalidation ran while the value was loading
+        with self._lock:
+            if epoch == self._epoch:
+                self.entries.put(key, value)
+
+    def _check_external_writes(self):
+        with self._lock:
+            try:
+                if self._watcher is None or self._generation != db.connection_generation():
+                    self._open_watcher()
+                    return
+                version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+                if version == self._version:
+                    return
+                self._version = version
+                last_seq, merged = self._log_position()
+                if merged != self._merged or last_seq - self._last_seq > self.entries.maxsize:
+                    self._drop_all()
+                elif last_seq != self._last_seq:
+                    self._epoch += 1
+                    for tbl, row_id in self._watcher.execute(
+                            "SELECT tbl, row_id FROM change_log WHERE seq > ?", (self._last_seq,)):
+                        if tbl == "registered_students":
+                            self.entries.pop(("registered", row_id))
+                        else:
+                            self.entries.pop(ENROLLED_IDS)
+                self._last_seq, self._merged = last_seq, merged
+            except sqlite3.Error:
+                # Unknown state: start over on the next lookup
+                self._close_watcher()
+                self._drop_all()
+
+    def _open_watcher(self):
+        self._close_watcher()
+        self._generation = db.connection_generation()
+        self._watcher = db.connect()
+        self._version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        self._last_seq, self._merged = self._log_position()
+        self._drop_all()
+
+    def _close_watcher(self):
+        if self._watcher is not None:
+            self._watcher.close()
+        self._watcher = None
+
+    def _log_position(self):
+        last_seq = self._watcher.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        merged = self._watcher.execute("SELECT COALESCE(SUM(received_seq), 0) FROM sync_peers").fetchone()[0]
+        return last_seq, merged
+
+    def _drop_all(self):
+        self._epoch += 1
+        self.entries.clear()
+
+
+student_cache = StudentCache()
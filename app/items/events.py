@@ -0,0 +1,57 @@
+import logging
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional
+
+log = logging.getLogger("app.events")
+
+# ChangeEvent.kind values
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+RESET = "reset"     # many rows changed at once (bulk work): reload
+
+# ChangeEvent.table values
+REGISTERED = "registered"
+ENROLLED = "enrolled"
+
+
+class ChangeEvent(NamedTuple):
+    kind: str
+    table: str
+    id: Optional[str] = None
+    # INSERT/UPDATE: the row as it now is. A RegisteredRow for registered,
+    # an (id, full_name, grade_level, strand) tuple for enrolled.
+    row: Any = None
+
+
+class ChangeBus:
+    """Publishes StudentService writes to subscribers.
+
+    Callbacks run synchronously on the thread that made the change (often a
+    worker), so GUI subscribers must hop to the UI thread themselves. A
+    failing subscriber is logged and does not affect the others.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[], None]:
+        # Returns a function that unsubscribes
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not callback]
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:
+                log.exception("Change subscriber failed on %s", event)
+
+
+change_bus = ChangeBus()
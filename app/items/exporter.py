@@ -0,0 +1,88 @@
+import csv
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from app.core.db import read_connection, read_transaction
+from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo, RepositoryError
+
+EXPORT_FORMATS = ("csv", "jsonl", "xlsx")
+
+REGISTERED_COLUMNS = ["id", "first_name", "middle_name", "last_name", "gender", "birth_date",
+                      "age", "contact", "guardian_name", "guardian_contact"]
+ENROLLED_COLUMNS = ["id", "full_name", "grade_level", "strand"]
+
+
+def write_csv(path: str, columns: List[str], rows: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+            count += 1
+    return count
+
+
+def write_jsonl(path: str, columns: List[str], rows: Iterable[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps({c: row[c] for c in columns}, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_xlsx(path: str, columns: List[str], rows: Iterable[Dict[str, Any]]) -> int:
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise RepositoryError("Exporting .xlsx files requires the openpyxl package.") from e
+    # write_only workbooks stream rows to disk instead of keeping cells around
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Students")
+    ws.append(columns)
+    count = 0
+    for row in rows:
+        ws.append([row[c] for c in columns])
+        count += 1
+    wb.save(path)
+    return count
+
+
+WRITERS: Dict[str, Callable[[str, List[str], Iterable[Dict[str, Any]]], int]] = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "xlsx": write_xlsx,
+}
+
+
+def _format_for(path: str, fmt: Optional[str]) -> str:
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt == "json":
+        fmt = "jsonl"
+    if fmt not in WRITERS:
+        raise RepositoryError(f"Unsupported export format: {fmt or path}")
+    return fmt
+
+
+def _registered_rows() -> Iterator[Dict[str, Any]]:
+    for row in RegisteredStudentRepo.iter_rows():
+        yield row._asdict()
+
+
+def export_registered(path: str, fmt: Optional[str] = None) -> int:
+    # Stream every registered student to `path`; returns the row count.
+    # The format comes from `fmt` or the file extension. The batches are
+    # read in one transaction, so a write mid-export can't tear the file.
+    writer = WRITERS[_format_for(path, fmt)]
+    with read_transaction(read_connection()):
+        return writer(path, REGISTERED_COLUMNS, _registered_rows())
+
+
+def export_enrolled(path: str, fmt: Optional[str] = None,
+                    grade_level: str = None, strand: str = None) -> int:
+    # Stream the enrolled roster, optionally for one grade and/or strand
+    writer = WRITERS[_format_for(path, fmt)]
+    with read_transaction(read_connection()):
+        return writer(path, ENROLLED_COLUMNS, EnrolledStudentRepo.iter_all(grade_level, strand))
@@ -0,0 +1,221 @@
+import csv
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.items.models import RegisteredStudent
+from app.items.repository import RegisteredStudentRepo, RepositoryError
+from app.items.validation import age_from_iso, normalize_phone, validate_students
+
+# Accepted header spellings (lower-cased, spaces/underscores removed) -> field
+HEADER_ALIASES = {
+    "firstname": "first_name",
+    "middlename": "middle_name",
+    "lastname": "last_name",
+    "surname": "last_name",
+    "gender": "gender",
+    "sex": "gender",
+    "birthdate": "birth_date",
+    "dateofbirth": "birth_date",
+    "birthday": "birth_date",
+    "contact": "contact",
+    "contactnumber": "contact",
+    "guardianname": "guardian_name",
+    "guardian": "guardian_name",
+    "guardiancontact": "guardian_contact",
+    "guardiancontactnumber": "guardian_contact",
+}
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    rejects_path: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+@lru_cache(maxsize=256)
+def _field_for(header: Any) -> Optional[str]:
+    key = str(header or "").strip().lower().replace(" ", "").replace("_", "")
+    return HEADER_ALIASES.get(key)
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _read_xlsx(path: str) -> Iterator[Dict[str, Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RepositoryError("Importing .xlsx files requires the openpyxl package.") from e
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = [str(h) if h is not None else "" for h in next(rows, ())]
+        for values in rows:
+            if values and any(v not in (None, "") for v in values):
+                yield dict(zip(headers, values))
+    finally:
+        wb.close()
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    # Stream the source file as header -> value dicts, one row at a time
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return _read_csv(path)
+    if ext in (".xlsx", ".xlsm"):
+        return _read_xlsx(path)
+    raise RepositoryError(f"Unsupported import file type: {ext or path}")
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _iso_date(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = _text(value)
+    if text and len(text) > 10:
+        text = text[:10]
+    return text
+
+
+def _contact(value: Any) -> Optional[str]:
+    # Canonical 09xxxxxxxxx form when it is a mobile number (this also puts
+    # back the leading zero spreadsheets drop); otherwise left for validation
+    text = _text(value)
+    return normalize_phone(text) or text
+
+
+def row_to_student(row: Dict[str, Any]) -> RegisteredStudent:
+    fields = {}
+    for header, value in row.items():
+        field = _field_for(header)
+        if field:
+            fields[field] = value
+    birth_date = _iso_date(fields.get("birth_date"))
+    return RegisteredStudent(
+        id=None,
+        first_name=_text(fields.get("first_name")),
+        middle_name=_text(fields.get("middle_name")),
+        last_name=_text(fields.get("last_name")),
+        gender=(_text(fields.get("gender")) or "").title() or None,
+        birth_date=birth_date,
+        age=age_from_iso(birth_date),
+        contact=_contact(fields.get("contact")),
+        guardian_name=_text(fields.get("guardian_name")),
+        guardian_contact=_contact(fields.get("guardian_contact")),
+    )
+
+
+class _RejectWriter:
+    """Writes rejected source rows plus the reason, opening the file lazily."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def write(self, line_no: int, row: Dict[str, Any], reason: str):
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._headers = list(row.keys())
+            self._writer.writerow(["row"] + self._headers + ["error"])
+        self._writer.writerow([line_no] + [row.get(h, "") for h in self._headers] + [reason])
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+def _validated(batch: List[Tuple[int, Dict[str, Any], RegisteredStudent]],
+               rejects: _RejectWriter, report: ImportReport):
+    # Validate a chunk in one columnar pass; rejects every broken rule per row
+    issues = validate_students([s for _, _, s in batch])
+    if not issues:
+        return batch
+    valid = []
+    for pos, item in enumerate(batch):
+        if pos in issues:
+            line_no, row, _ = item
+            rejects.write(line_no, row, "; ".join(i.message for i in issues[pos]))
+            report.rejected += 1
+        else:
+            valid.append(item)
+    return valid
+
+
+def _flush(batch: List[Tuple[int, Dict[str, Any], RegisteredStudent]],
+           rejects: _RejectWriter, report: ImportReport):
+    if not batch:
+        return
+    try:
+        RegisteredStudentRepo.add_many([s for _, _, s in batch])
+        report.imported += len(batch)
+        return
+    except RepositoryError:
+        pass
+    # Something in the chunk broke a constraint; retry row by row to isolate it
+    for line_no, row, student in batch:
+        try:
+            RegisteredStudentRepo.add(student)
+            report.imported += 1
+        except RepositoryError as e:
+            rejects.write(line_no, row, str(e))
+            report.rejected += 1
+
+
+def import_students(path: str, chunk_size: int = 2000,
+                    progress: Optional[Callable[[ImportReport], None]] = None,
+                    rejects_path: Optional[str] = None) -> ImportReport:
+    # Stream a CSV/XLSX roster into registered_students. Rows are validated
+    # with the same rules as StudentService.register and inserted in
+    # chunked transactions; invalid rows go to a "<name>_rejected.csv" file.
+    if rejects_path is None:
+        stem, _ = os.path.splitext(path)
+        rejects_path = f"{stem}_rejected.csv"
+    report = ImportReport()
+    rejects = _RejectWriter(rejects_path)
+    batch = []
+    start = time.perf_counter()
+    try:
+        # Line 1 is the header row
+        for line_no, row in enumerate(read_rows(path), start=2):
+            report.total += 1
+            batch.append((line_no, row, row_to_student(row)))
+            if len(batch) >= chunk_size:
+                _flush(_validated(batch, rejects, report), rejects, report)
+                batch = []
+                report.seconds = time.perf_counter() - start
+                if progress:
+                    progress(report)
+        if batch:
+            _flush(_validated(batch, rejects, report), rejects, report)
+    finally:
+        rejects.close()
+        report.seconds = time.perf_counter() - start
+    if rejects.path and report.rejected:
+        report.rejects_path = rejects.path
+    if progress:
+        progress(report)
+    return report
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-@dataclass
+# Models built per row are slotted: no per-instance __dict__, and they can be
+# built positionally from a SELECT in field order (see REGISTERED_FIELDS).
+@dataclass(slots=True)
 class RegisteredStudent:
     id: Optional[str]
     first_name: str
@@ -14,8 +16,101 @@ class RegisteredStudent:
     guardian_name: str
     guardian_contact: str
 
-@dataclass
+@dataclass(slots=True)
 class EnrolledStudent:
     id: str
     grade_level: str
     strand: str
+
+# Column order of registered_students rows as the models expect them
+REGISTERED_FIELDS = tuple(f.name for f in fields(RegisteredStudent))
+
+
+class RegisteredRow(NamedTuple):
+    """Read-only, tuple-backed view of a registered student for list screens."""
+    id: str
+    first_name: str
+    middle_name: Optional[str]
+    last_name: str
+    gender: str
+    birth_date: str
+    age: int
+    contact: str
+    guardian_name: str
+    guardian_contact: str
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.middle_name or ''} {self.last_name}".replace("  ", " ").strip()
+
+    def to_student(self) -> RegisteredStudent:
+        return RegisteredStudent(*self)
+
+    @classmethod
+    def from_student(cls, student: RegisteredStudent) -> "RegisteredRow":
+        return cls._make(getattr(student, name) for name in REGISTERED_FIELDS)
+
+# RegisteredStatusRow.status values, also accepted as status filters
+ENROLLED = "enrolled"
+UNENROLLED = "unenrolled"
+
+class RegisteredStatusRow(NamedTuple):
+    """A RegisteredRow plus the student's placement (None when not enrolled)."""
+    id: str
+    first_name: str
+    middle_name: Optional[str]
+    last_name: str
+    gender: str
+    birth_date: str
+    age: int
+    contact: str
+    guardian_name: str
+    guardian_contact: str
+    grade_level: Optional[str] = None
+    strand: Optional[str] = None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.middle_name or ''} {self.last_name}".replace("  ", " ").strip()
+
+    @property
+    def status(self) -> str:
+        return UNENROLLED if self.grade_level is None else ENROLLED
+
+    def registered(self) -> RegisteredRow:
+        return RegisteredRow._make(self[:len(REGISTERED_FIELDS)])
+
+    @classmethod
+    def from_row(cls, row: RegisteredRow, grade_level: Optional[str] = None,
+                 strand: Optional[str] = None) -> "RegisteredStatusRow":
+        return cls(*row, grade_level, strand)
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_key: Optional[str] = None  # pass back as after_key; None on the last page
+
+@dataclass
+class EnrollmentStats:
+    registered: int = 0
+    enrolled: int = 0
+    by_grade: Dict[str, int] = field(default_factory=dict)
+    by_grade_strand: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    by_gender: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_counters(cls, counters: Dict[str, int]) -> "EnrollmentStats":
+        # Build from enrollment_counters rows ("enrolled:grade:11" -> 42, ...)
+        stats = cls(registered=counters.get("registered", 0), enrolled=counters.get("enrolled", 0))
+        for name, value in counters.items():
+            parts = name.split(":")
+            if parts[0] == "registered" and len(parts) == 3 and parts[1] == "gender":
+                stats.by_gender[parts[2]] = value
+            elif parts[0] == "enrolled" and len(parts) == 3 and parts[1] == "grade":
+                stats.by_grade[parts[2]] = value
+            elif parts[0] == "enrolled" and len(parts) == 4 and parts[1] == "grade_strand":
+                stats.by_grade_strand[(parts[2], parts[3])] = value
+        return stats
+
+    def count(self, grade_level: str, strand: str) -> int:
+        return self.by_grade_strand.get((grade_level, strand), 0)
@@ -1,7 +1,14 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
+from itertools import starmap
+import base64
+import json
+import re
 import sqlite3
-from app.core.db import get_connection, generate_next_id
-from app.items.models import RegisteredStudent, EnrolledStudent
+import threading
+from app.core.db import get_connection, read_connection, write_transaction, generate_next_id, reserve_ids, format_student_id
+from app.core.migrations import FTS_TABLE
+from app.items.models import (RegisteredStudent, EnrolledStudent, EnrollmentStats, Page,
+                              RegisteredRow, RegisteredStatusRow, REGISTERED_FIELDS, ENROLLED, UNENROLLED)
 
 # Custom exceptions
 class DeletionBlockedError(Exception):
@@ -10,6 +17,47 @@ class DeletionBlockedError(Exception):
 class RepositoryError(Exception):
     pass
 
+# Rows pulled per fetchmany() call by the iter_* streaming readers
+FETCH_BATCH_SIZE = 500
+# Default number of rows per get_page() call
+PAGE_SIZE = 100
+
+# Explicit column list in model field order, so rows decode positionally
+REGISTERED_SELECT = f"SELECT {', '.join(REGISTERED_FIELDS)} FROM registered_students"
+
+# The same columns from `registered_students r`, and the placement from an
+# outer join on enrolled_students' primary key (NULLs when not enrolled)
+REGISTERED_COLUMNS = ", ".join(f"r.{name}" for name in REGISTERED_FIELDS)
+STATUS_COLUMNS = f"{REGISTERED_COLUMNS}, e.grade_level, e.strand"
+STATUS_JOIN = "LEFT JOIN enrolled_students e ON e.id = r.id"
+STATUS_CONDITIONS = {
+    None: None,
+    ENROLLED: "e.id IS NOT NULL",
+    UNENROLLED: "e.id IS NULL",
+}
+
+INSERT_REGISTERED_SQL = """
+    INSERT INTO registered_students
+    (id, first_name, middle_name, last_name, gender, birth_date, age, contact, guardian_name, guardian_contact)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _insert_params(sid: str, student: RegisteredStudent) -> tuple:
+    return (
+        sid,
+        student.first_name.strip(),
+        student.middle_name.strip() if student.middle_name else None,
+        student.last_name.strip(),
+        student.gender.strip(),
+        student.birth_date,
+        student.age,
+        student.contact.strip() if student.contact else None,
+        student.guardian_name.strip() if student.guardian_name else None,
+        student.guardian_contact.strip() if student.guardian_contact else None
+    )
+
+
 class RegisteredStudentRepo:
     """Repository for registered students CRUD operations"""
 
@@ -19,23 +67,8 @@ class RegisteredStudentRepo:
         try:
             with get_connection() as conn:
                 cur = conn.cursor()
-                new_id = student.id or generate_next_id("registered_students")
-                cur.execute("""
-                    INSERT INTO registered_students
-                    (id, first_name, middle_name, last_name, gender, birth_date, age, contact, guardian_name, guardian_contact)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    new_id,
-                    student.first_name.strip(),
-                    student.middle_name.strip() if student.middle_name else None,
-                    student.last_name.strip(),
-                    student.gender.strip(),
-                    student.birth_date,
-                    student.age,
-                    student.contact.strip() if student.contact else None,
-                    student.guardian_name.strip() if student.guardian_name else None,
-                    student.guardian_contact.strip() if student.guardian_contact else None
-                ))
+                new_id = student.id or generate_next_id("registered_students", conn)
+                cur.execute(INSERT_REGISTERED_SQL, _insert_params(new_id, student))
                 conn.commit()
                 return new_id
         except sqlite3.IntegrityError as e:
@@ -43,23 +76,84 @@ class RegisteredStudentRepo:
         except sqlite3.Error as e:
             raise RepositoryError(f"Database error while adding student: {e}") from e
 
+    @classmethod
+    def add_many(cls, students: List[RegisteredStudent]) -> List[str]:
+        # Add a batch of students in one transaction; all or nothing.
+        # IDs for students without one are reserved as a single block.
+        if not students:
+            return []
+        try:
+            with get_connection() as conn:
+                missing = sum(1 for s in students if not s.id)
+                numbers = iter(reserve_ids("registered_students", missing, conn) if missing else ())
+                ids = [s.id or format_student_id(next(numbers)) for s in students]
+                conn.executemany(INSERT_REGISTERED_SQL,
+                                 [_insert_params(sid, s) for sid, s in zip(ids, students)])
+                conn.commit()
+                return ids
+        except sqlite3.IntegrityError as e:
+            raise RepositoryError("A database constraint failed (possibly duplicate ID).") from e
+        except sqlite3.Error as e:
+            raise RepositoryError(f"Database error while adding students: {e}") from e
+
     @classmethod
     def get_all(cls) -> List[RegisteredStudent]:
         # Fetch all registered students
-        with get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM registered_students ORDER BY id")
-            rows = cur.fetchall()
-            return [RegisteredStudent(**dict(r)) for r in rows]
+        return list(cls.iter_all())
+
+    @classmethod
+    def iter_all(cls, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[RegisteredStudent]:
+        # Stream registered students in id order without materialising them all
+        return _iter_registered(RegisteredStudent, batch_size)
+
+    @classmethod
+    def get_rows(cls) -> List[RegisteredRow]:
+        # All registered students as lightweight read-only rows (list screens)
+        return list(cls.iter_rows())
+
+    @classmethod
+    def iter_rows(cls, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[RegisteredRow]:
+        return _iter_registered(RegisteredRow, batch_size)
+
+    @classmethod
+    def get_status_rows(cls, status: Optional[str] = None) -> List[RegisteredStatusRow]:
+        # Registered students with their grade/strand in one query, optionally
+        # only the "enrolled" or "unenrolled" ones
+        return list(cls.iter_status_rows(status))
+
+    @classmethod
+    def iter_status_rows(cls, status: Optional[str] = None,
+                         batch_size: int = FETCH_BATCH_SIZE) -> Iterator[RegisteredStatusRow]:
+        condition = _status_condition(status)
+        sql = f"SELECT {STATUS_COLUMNS} FROM registered_students r {STATUS_JOIN}"
+        if condition:
+            sql += f" WHERE {condition}"
+        # The registration list reloads this right after its own writes, so
+        # it reads the database itself rather than a replica that may lag
+        return _iter_registered(RegisteredStatusRow, batch_size, f"{sql} ORDER BY r.id", get_connection)
 
     @classmethod
     def get(cls, sid: str) -> Optional[RegisteredStudent]:
         # Get a student by ID
         with get_connection() as conn:
             cur = conn.cursor()
-            cur.execute("SELECT * FROM registered_students WHERE id=?", (sid,))
+            cur.execute(f"{REGISTERED_SELECT} WHERE id=?", (sid,))
             row = cur.fetchone()
-            return RegisteredStudent(**dict(row)) if row else None
+            return RegisteredStudent(*row) if row else None
+
+    @classmethod
+    def get_many(cls, sids: List[str]) -> Dict[str, RegisteredStudent]:
+        # Look up several students in one round trip; missing IDs are absent
+        result = {}
+        unique = list(dict.fromkeys(sids))
+        with get_connection() as conn:
+            cur = conn.cursor()
+            for start in range(0, len(unique), FETCH_BATCH_SIZE):
+                chunk = unique[start:start + FETCH_BATCH_SIZE]
+                cur.execute(f"{REGISTERED_SELECT} WHERE id IN ({', '.join('?' for _ in chunk)})", chunk)
+                for student in starmap(RegisteredStudent, cur.fetchall()):
+                    result[student.id] = student
+        return result
 
     @classmethod
     def update(cls, sid: str, student: RegisteredStudent) -> bool:
@@ -91,32 +185,136 @@ class RegisteredStudentRepo:
 
     @classmethod
     def delete(cls, sid: str) -> bool:
-        # Delete student if not enrolled
-        with get_connection() as conn:
+        # Delete student if not enrolled; the write lock is taken before the
+        # check so an enrollment can't slip in between
+        with write_transaction() as conn:
             cur = conn.cursor()
             cur.execute("SELECT 1 FROM enrolled_students WHERE id=? LIMIT 1", (sid,))
             if cur.fetchone():
                 raise DeletionBlockedError("Student is currently enrolled.")
             cur.execute("DELETE FROM registered_students WHERE id=?", (sid,))
-            conn.commit()
             return cur.rowcount > 0
 
     @classmethod
-    def search(cls, query: str) -> List[RegisteredStudent]:
-        # Search students by ID, name, contact, or guardian
-        like = f"%{query}%"
+    def search(cls, query: str, limit: Optional[int] = None) -> List[RegisteredStudent]:
+        # Search students by ID, name, contact, or guardian. Names go through
+        # the FTS5 index (prefix match, best match first) when the database
+        # has one; queries with digits (IDs, phone numbers) match anywhere
+        # in the value, as LIKE always did.
+        return list(starmap(RegisteredStudent, cls._search_rows(query, limit)))
+
+    @classmethod
+    def search_status_rows(cls, query: str, status: Optional[str] = None,
+                           limit: Optional[int] = None) -> List[RegisteredStatusRow]:
+        # search() with each student's grade/strand joined in the same query
+        condition = _status_condition(status)
+        rows = cls._search_rows(query, limit, STATUS_COLUMNS, STATUS_JOIN, condition)
+        return list(starmap(RegisteredStatusRow, rows))
+
+    @classmethod
+    def _search_rows(cls, query: str, limit: Optional[int], columns: str = REGISTERED_COLUMNS,
+                     join: str = "", condition: Optional[str] = None):
+        match = _fts_match_expression(query)
         with get_connection() as conn:
             cur = conn.cursor()
-            cur.execute("""
-                SELECT id, first_name, middle_name, last_name, gender, birth_date, age,
-                       contact, guardian_name, guardian_contact
-                FROM registered_students
-                WHERE id LIKE ? OR first_name LIKE ? OR middle_name LIKE ? OR last_name LIKE ?
-                      OR contact LIKE ? OR guardian_name LIKE ? OR guardian_contact LIKE ?
-                ORDER BY id
-            """, (like, like, like, like, like, like, like))
-            rows = cur.fetchall()
-            return [RegisteredStudent(**dict(r)) for r in rows]
+            if match and _has_search_index(cur):
+                return cls._search_fts(cur, match, limit, columns, join, condition)
+            return cls._search_like(cur, query, limit, columns, join, condition)
+
+    @staticmethod
+    def _search_fts(cur: sqlite3.Cursor, match: str, limit: Optional[int] = None,
+                    columns: str = REGISTERED_COLUMNS, join: str = "", condition: Optional[str] = None):
+        # Column weights for bm25(): ID and names count more than contacts
+        cur.execute(f"""
+            SELECT {columns}
+            FROM {FTS_TABLE} f
+            JOIN registered_students r ON r.rowid = f.rowid
+            {join}
+            WHERE {FTS_TABLE} MATCH ?{f" AND {condition}" if condition else ""}
+            ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 3.0, 5.0, 2.0, 1.0, 1.0), r.id
+            LIMIT ?
+        """, (match, -1 if limit is None else limit))
+        return cur.fetchall()
+
+    @staticmethod
+    def _search_like(cur: sqlite3.Cursor, query: str, limit: Optional[int] = None,
+                     columns: str = REGISTERED_COLUMNS, join: str = "", condition: Optional[str] = None):
+        like = f"%{query}%"
+        cur.execute(f"""
+            SELECT {columns}
+            FROM registered_students r
+            {join}
+            WHERE (r.id LIKE ? OR r.first_name LIKE ? OR r.middle_name LIKE ? OR r.last_name LIKE ?
+                   OR r.contact LIKE ? OR r.guardian_name LIKE ? OR r.guardian_contact LIKE ?)
+                  {f"AND {condition}" if condition else ""}
+            ORDER BY r.id
+            LIMIT ?
+        """, (like, like, like, like, like, like, like, -1 if limit is None else limit))
+        return cur.fetchall()
+
+    @classmethod
+    def get_page(cls, after_key: Optional[str] = None, limit: int = PAGE_SIZE,
+                 order_by: str = "id") -> Page:
+        # Keyset page of registered students ordered by "id" or "last_name".
+        # Seeks past after_key on an index, so deep pages cost the same as the first.
+        order_sql, key_cols = REGISTERED_PAGE_ORDERS.get(order_by, (None, None))
+        if order_sql is None:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        sql = REGISTERED_SELECT
+        params = []
+        if after_key:
+            sql += f" WHERE {_seek_condition(key_cols)}"
+            params.extend(_decode_key(after_key, order_by, len(key_cols)))
+        sql += f" ORDER BY {order_sql} LIMIT ?"
+        return _fetch_page(sql, params, limit, order_by, lambda r: RegisteredStudent(*r))
+
+
+def _iter_registered(build, batch_size: int, sql: str = f"{REGISTERED_SELECT} ORDER BY id",
+                     connection=read_connection):
+    # Plain tuples off the cursor (no sqlite3.Row), handed straight to `build`
+    cur = connection().cursor()
+    cur.row_factory = None
+    try:
+        cur.execute(sql)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from starmap(build, rows)
+    finally:
+        cur.close()
+
+
+def _status_condition(status: Optional[str]) -> Optional[str]:
+    if status not in STATUS_CONDITIONS:
+        raise ValueError(f"Unsupported status: {status}")
+    return STATUS_CONDITIONS[status]
+
+
+def _fts_match_expression(query: str) -> Optional[str]:
+    # Turn free text into an FTS5 query: every word must match as a prefix.
+    # None sends the query to LIKE: FTS5 only matches from the start of a
+    # token, so "000001" would miss S000001 and "4567" a phone number.
+    terms = re.findall(r"\w+", query or "")
+    if not terms or any(ch.isdigit() for ch in query):
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+# (connection, has index) for this thread's pooled connection
+_index_check = threading.local()
+
+
+def _has_search_index(cur: sqlite3.Cursor) -> bool:
+    # Looked up once per connection; configure() opens new connections
+    conn = cur.connection
+    cached = getattr(_index_check, "value", None)
+    if cached is not None and cached[0] is conn:
+        return cached[1]
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,))
+    found = cur.fetchone() is not None
+    _index_check.value = (conn, found)
+    return found
 
 # ------------------- Enrolled Students -------------------
 class EnrolledStudentRepo:
@@ -135,29 +333,73 @@ class EnrolledStudentRepo:
             conn.commit()
             return enrollment.id
 
+    @staticmethod
+    def enroll_many(enrollments: List[EnrolledStudent]) -> List[str]:
+        # Enroll a batch in one transaction; all or nothing
+        if not enrollments:
+            return []
+        ids = [e.id for e in enrollments]
+        try:
+            with get_connection() as conn:
+                cur = conn.cursor()
+                found = set()
+                unique = list(dict.fromkeys(ids))
+                for start in range(0, len(unique), FETCH_BATCH_SIZE):
+                    chunk = unique[start:start + FETCH_BATCH_SIZE]
+                    cur.execute(f"SELECT id FROM registered_students WHERE id IN ({', '.join('?' for _ in chunk)})",
+                                chunk)
+                    found.update(r[0] for r in cur.fetchall())
+                missing = [sid for sid in unique if sid not in found]
+                if missing:
+                    raise RepositoryError(f"Registered student id {missing[0]} not found.")
+                cur.executemany("INSERT INTO enrolled_students (id, grade_level, strand) VALUES (?, ?, ?)",
+                                [(e.id, e.grade_level, e.strand) for e in enrollments])
+                conn.commit()
+                return ids
+        except sqlite3.IntegrityError as e:
+            raise RepositoryError("A database constraint failed (possibly already enrolled).") from e
+        except sqlite3.Error as e:
+            raise RepositoryError(f"Database error while enrolling students: {e}") from e
+
     @staticmethod
     def get_all() -> List[Dict[str, Any]]:
         # List all enrolled students with names
-        with get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT e.id, r.first_name, r.middle_name, r.last_name,
-                       e.grade_level, e.strand
-                FROM enrolled_students e
-                JOIN registered_students r ON e.id = r.id
-                ORDER BY e.id
-            """)
-            rows = cur.fetchall()
-            result = []
-            for row in rows:
-                full_name = f"{row['first_name']} {row['middle_name'] or ''} {row['last_name']}".replace("  ", " ").strip()
-                result.append({
-                    "id": row["id"],
-                    "full_name": full_name,
-                    "grade_level": row["grade_level"],
-                    "strand": row["strand"]
-                })
-            return result
+        return list(EnrolledStudentRepo.iter_all())
+
+    @staticmethod
+    def iter_all(grade_level: str = None, strand: str = None,
+                 batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        # Stream enrolled students with names, optionally by grade and/or strand
+        sql, params = _enrolled_query(grade_level, strand)
+        cur = read_connection().cursor()
+        try:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _enrolled_dict(row)
+        finally:
+            cur.close()
+
+    @staticmethod
+    def get_page(after_key: Optional[str] = None, limit: int = PAGE_SIZE, order_by: str = "id",
+                 grade_level: str = None, strand: str = None) -> Page:
+        # Keyset page of enrolled students ordered by "id", "last_name" or
+        # "strand", with the same optional filters as filter()
+        order_sql, key_cols = ENROLLED_PAGE_ORDERS.get(order_by, (None, None))
+        if order_sql is None:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        conditions, params = _enrolled_conditions(grade_level, strand)
+        if after_key:
+            conditions.append(_seek_condition(key_cols))
+            params.extend(_decode_key(after_key, order_by, len(key_cols)))
+        sql = ENROLLED_SELECT
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_sql} LIMIT ?"
+        return _fetch_page(sql, params, limit, order_by, _enrolled_dict, read_connection())
 
     @staticmethod
     def update(eid: str, grade: str, strand: str) -> bool:
@@ -180,26 +422,127 @@ class EnrolledStudentRepo:
     @staticmethod
     def filter(grade_level: str = None, strand: str = None):
         # Filter enrolled students by grade and/or strand
-        with get_connection() as conn:
-            cur = conn.cursor()
-            sql = """
-                SELECT e.id, r.first_name, r.middle_name, r.last_name,
-                       e.grade_level, e.strand
-                FROM enrolled_students e
-                JOIN registered_students r ON e.id = r.id
-            """
-            params = []
-            conditions = []
-
-            if grade_level and grade_level != "All":
-                conditions.append("e.grade_level = ?")
-                params.append(grade_level)
-            if strand and strand != "All":
-                conditions.append("e.strand = ?")
-                params.append(strand)
-
-            if conditions:
-                sql += " WHERE " + " AND ".join(conditions)
-            sql += " ORDER BY e.id"
-            cur.execute(sql, params)
-            return cur.fetchall()
+        cur = read_connection().execute(*_enrolled_query(grade_level, strand))
+        return cur.fetchall()
+
+
+ENROLLED_SELECT = """
+    SELECT e.id, r.first_name, r.middle_name, r.last_name,
+           e.grade_level, e.strand
+    FROM enrolled_students e
+    JOIN registered_students r ON e.id = r.id
+"""
+
+
+def _enrolled_conditions(grade_level: str = None, strand: str = None):
+    # Optional grade/strand filters ("All" means no filter)
+    params = []
+    conditions = []
+
+    if grade_level and grade_level != "All":
+        conditions.append("e.grade_level = ?")
+        params.append(grade_level)
+    if strand and strand != "All":
+        conditions.append("e.strand = ?")
+        params.append(strand)
+    return conditions, params
+
+
+def _enrolled_query(grade_level: str = None, strand: str = None):
+    # Enrolled JOIN with optional grade/strand filters
+    conditions, params = _enrolled_conditions(grade_level, strand)
+    sql = ENROLLED_SELECT
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY e.id"
+    return sql, params
+
+
+def _enrolled_dict(row) -> Dict[str, Any]:
+    full_name = f"{row['first_name']} {row['middle_name'] or ''} {row['last_name']}".replace("  ", " ").strip()
+    return {
+        "id": row["id"],
+        "full_name": full_name,
+        "grade_level": row["grade_level"],
+        "strand": row["strand"]
+    }
+
+
+# ------------------- Keyset pagination -------------------
+# order_by -> (ORDER BY clause, seek key columns). Each order ends in the
+# unique id so keys are total, and each is backed by an index. A
+# " COLLATE NOCASE" suffix is put on the placeholder side of the seek so
+# SQLite still matches the NOCASE index and can seek rather than scan.
+REGISTERED_PAGE_ORDERS = {
+    "id": ("id", ["id"]),
+    "last_name": ("last_name COLLATE NOCASE, first_name COLLATE NOCASE, id",
+                  ["last_name COLLATE NOCASE", "first_name COLLATE NOCASE", "id"]),
+}
+ENROLLED_PAGE_ORDERS = {
+    "id": ("e.id", ["e.id"]),
+    "last_name": ("r.last_name COLLATE NOCASE, r.first_name COLLATE NOCASE, r.id",
+                  ["r.last_name COLLATE NOCASE", "r.first_name COLLATE NOCASE", "r.id"]),
+    "strand": ("e.strand, e.id", ["e.strand", "e.id"]),
+}
+# Result columns holding each order's key values, in seek-column order
+PAGE_KEY_FIELDS = {
+    "id": ["id"],
+    "last_name": ["last_name", "first_name", "id"],
+    "strand": ["strand", "id"],
+}
+
+
+def _seek_condition(key_cols: List[str]) -> str:
+    # Row-value comparison so SQLite can seek the matching index
+    if len(key_cols) == 1:
+        return f"{key_cols[0]} > ?"
+    columns, placeholders = [], []
+    for col in key_cols:
+        name, _, collation = col.partition(" COLLATE ")
+        columns.append(name)
+        placeholders.append(f"? COLLATE {collation}" if collation else "?")
+    return f"({', '.join(columns)}) > ({', '.join(placeholders)})"
+
+
+def _fetch_page(sql: str, params: list, limit: int, order_by: str, convert,
+                conn: sqlite3.Connection = None) -> Page:
+    # Ask for one extra row to learn whether another page follows
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    with conn or get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, params + [limit + 1])
+        rows = cur.fetchall()
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_key = _encode_key(order_by, [last[k] for k in PAGE_KEY_FIELDS[order_by]])
+    return Page([convert(r) for r in rows], next_key)
+
+
+def _encode_key(order_by: str, values: List[Any]) -> str:
+    raw = json.dumps([order_by, values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_key(token: str, order_by: str, size: int) -> List[Any]:
+    try:
+        key_order, values = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise RepositoryError("Invalid page token.") from e
+    if key_order != order_by or not isinstance(values, list) or len(values) != size:
+        raise RepositoryError("Page token does not match the requested ordering.")
+    return values
+
+
+# ------------------- Statistics -------------------
+class StatsRepo:
+    """Reads the trigger-maintained enrollment_counters table"""
+
+    @staticmethod
+    def get_stats() -> EnrollmentStats:
+        # One query over a handful of rows, whatever the roster size. No
+        # `with conn`: its commit would end a caller's read_transaction().
+        cur = read_connection().execute("SELECT name, value FROM enrollment_counters")
+        return EnrollmentStats.from_counters({name: value for name, value in cur.fetchall()})
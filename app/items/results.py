@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from typing import Any, Generic, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+# ServiceError.kind values
+VALIDATION = "validation"
+BLOCKED = "blocked"
+NOT_FOUND = "not_found"
+DUPLICATE = "duplicate"
+DATABASE = "database"
+
+
+class ServiceError(NamedTuple):
+    kind: str
+    title: str
+    message: str
+
+
+@dataclass
+class Result(Generic[T]):
+    """Outcome of one StudentService operation: a value or an error."""
+    value: Optional[T] = None
+    error: Optional[ServiceError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @classmethod
+    def success(cls, value: T = None) -> "Result[T]":
+        return cls(value=value)
+
+    @classmethod
+    def failure(cls, kind: str, title: str, message: str) -> "Result[T]":
+        return cls(error=ServiceError(kind, title, message))
+
+
+class RowError(NamedTuple):
+    index: int              # position in the input sequence
+    record: Any
+    error: ServiceError
+
+
+@dataclass
+class BulkResult:
+    total: int = 0
+    ids: List[str] = field(default_factory=list)
+    errors: List[RowError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.ids)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
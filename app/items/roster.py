@@ -0,0 +1,259 @@
+import os
+import threading
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import compress, repeat
+from operator import and_
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.items.models import RegisteredStudent
+from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo
+
+# Dictionary-encoded columns; code 0 always means "none" (e.g. not enrolled)
+CATEGORICAL = ("grade_level", "strand", "gender")
+NUMERIC = ("age", "birth_date")
+UNKNOWN_AGE = -1
+
+
+class Dictionary:
+    """Maps category values to small integer codes and back."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+
+def _birth_ordinal(iso: Optional[str]) -> int:
+    # Birth dates are kept as proleptic ordinals; 0 means missing or invalid
+    try:
+        return date.fromisoformat(iso).toordinal() if iso else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+class RosterStore:
+    """Columnar snapshot of the roster for dashboards and analytics.
+
+    One row per registered student. grade_level, strand and gender are
+    dictionary-encoded into array('H') columns, age and birth date (as a day
+    ordinal) into integer arrays; ids stay in a list with an id -> row map.
+    Aggregations run over whole columns with Counter/zip/compress, so they
+    stay in C for the bulk of the work. Removing a row moves the last row
+    into its slot, so row order is not meaningful.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.dictionaries = {name: Dictionary() for name in CATEGORICAL}
+        self.columns: Dict[str, array] = {
+            "grade_level": array("H"),
+            "strand": array("H"),
+            "gender": array("H"),
+            "age": array("h"),
+            "birth_date": array("l"),
+        }
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls) -> "RosterStore":
+        # One streaming pass over each roster; nothing is materialised
+        store = cls()
+        for s in RegisteredStudentRepo.iter_rows():
+            store._append(s.id, s.gender, s.age, s.birth_date)
+        for e in EnrolledStudentRepo.iter_all():
+            store._set_enrollment(e["id"], e["grade_level"], e["strand"])
+        return store
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------- Incremental updates -------------------
+
+    def add(self, sid: str, student: RegisteredStudent):
+        # A newly registered (or edited) student; enrollment is kept on edits
+        with self._lock:
+            row = self.rows.get(sid)
+            if row is None:
+                self._append(sid, student.gender, student.age, student.birth_date)
+                return
+            self.columns["gender"][row] = self.dictionaries["gender"].encode(student.gender)
+            self.columns["age"][row] = _age(student.age)
+            self.columns["birth_date"][row] = _birth_ordinal(student.birth_date)
+
+    def remove(self, sid: str) -> bool:
+        with self._lock:
+            row = self.rows.pop(sid, None)
+            if row is None:
+                return False
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+                for col in self.columns.values():
+                    col[row] = col[last]
+            self.ids.pop()
+            for col in self.columns.values():
+                col.pop()
+            return True
+
+    def enroll(self, sid: str, grade_level: str, strand: str) -> bool:
+        with self._lock:
+            return self._set_enrollment(sid, grade_level, strand)
+
+    def drop(self, sid: str) -> bool:
+        # Student stays registered, just no longer enrolled
+        with self._lock:
+            return self._set_enrollment(sid, None, None)
+
+    def _append(self, sid: str, gender: Optional[str], age: Optional[int], birth_date: Optional[str]):
+        self.rows[sid] = len(self.ids)
+        self.ids.append(sid)
+        self.columns["grade_level"].append(0)
+        self.columns["strand"].append(0)
+        self.columns["gender"].append(self.dictionaries["gender"].encode(gender))
+        self.columns["age"].append(_age(age))
+        self.columns["birth_date"].append(_birth_ordinal(birth_date))
+
+    def _set_enrollment(self, sid: str, grade_level: Optional[str], strand: Optional[str]) -> bool:
+        row = self.rows.get(sid)
+        if row is None:
+            return False
+        self.columns["grade_level"][row] = self.dictionaries["grade_level"].encode(grade_level)
+        self.columns["strand"][row] = self.dictionaries["strand"].encode(strand)
+        return True
+
+    # ------------------- Queries -------------------
+
+    def mask(self, enrolled: Optional[bool] = None, min_age: Optional[int] = None,
+             max_age: Optional[int] = None, **equals: Optional[str]) -> Optional[Iterable[bool]]:
+        # Row selector for the given filters, or None for "every row".
+        # equals takes categorical columns, e.g. grade_level="11", strand="STEM";
+        # "All" and None mean no filter, as in the enrolled repository.
+        selectors = []
+        for name, value in equals.items():
+            if name not in self.dictionaries:
+                raise ValueError(f"Unknown categorical column: {name}")
+            if value is None or value == "All":
+                continue
+            code = self.dictionaries[name].codes.get(value)
+            if code is None:
+                return repeat(False, len(self.ids))
+            selectors.append(map(code.__eq__, self.columns[name]))
+        if enrolled is not None:
+            flags = map(bool, self.columns["grade_level"])
+            selectors.append(flags if enrolled else map((0).__eq__, self.columns["grade_level"]))
+        if min_age is not None:
+            selectors.append(map((min_age - 1).__lt__, self.columns["age"]))
+        if max_age is not None:
+            selectors.append(map((max_age + 1).__gt__, self.columns["age"]))
+        if not selectors:
+            return None
+        combined = selectors[0]
+        for selector in selectors[1:]:
+            combined = map(and_, combined, selector)
+        return combined
+
+    def filter(self, **filters) -> List[str]:
+        # IDs of the rows matching mask(**filters)
+        with self._lock:
+            selector = self.mask(**filters)
+            return list(self.ids) if selector is None else list(compress(self.ids, selector))
+
+    def count(self, **filters) -> int:
+        with self._lock:
+            selector = self.mask(**filters)
+            return len(self.ids) if selector is None else sum(selector)
+
+    def group_count(self, by: Sequence[str], **filters) -> Dict[Tuple[Any, ...], int]:
+        # Row counts per combination of values of the `by` columns,
+        # e.g. group_count(["grade_level", "strand"], enrolled=True)
+        with self._lock:
+            columns = [self._column(name) for name in by]
+            keys = zip(*columns)
+            selector = self.mask(**filters)
+            counts = Counter(keys if selector is None else compress(keys, selector))
+            return {self._decode(by, key): n for key, n in counts.items()}
+
+    def crosstab(self, rows: str, cols: str, **filters) -> Dict[Any, Dict[Any, int]]:
+        # Nested {row value: {column value: count}}
+        table: Dict[Any, Dict[Any, int]] = {}
+        for (r, c), n in self.group_count([rows, cols], **filters).items():
+            table.setdefault(r, {})[c] = n
+        return table
+
+    def histogram(self, column: str = "age", bin_width: int = 1, **filters) -> Dict[int, int]:
+        # Counts per bin start for a numeric column, unknown values left out.
+        # Birth dates are binned by year whatever the bin width.
+        if column not in NUMERIC:
+            raise ValueError(f"Not a numeric column: {column}")
+        with self._lock:
+            values = self.columns[column]
+            selector = self.mask(**filters)
+            if selector is not None:
+                values = compress(values, selector)
+            counts = Counter(values)
+        result: Dict[int, int] = {}
+        for value, n in counts.items():
+            if column == "age":
+                if value == UNKNOWN_AGE:
+                    continue
+                start = value - value % bin_width
+            else:
+                if value == 0:
+                    continue
+                year = date.fromordinal(value).year
+                start = year - year % bin_width
+            result[start] = result.get(start, 0) + n
+        return dict(sorted(result.items()))
+
+    def _column(self, name: str) -> array:
+        column = self.columns.get(name)
+        if column is None:
+            raise ValueError(f"Unknown column: {name}")
+        return column
+
+    def _decode(self, by: Sequence[str], key: Tuple[int, ...]) -> Tuple[Any, ...]:
+        return tuple(self.dictionaries[name].decode(code) if name in self.dictionaries else code
+                     for name, code in zip(by, key))
+
+
+def _age(value: Optional[int]) -> int:
+    return UNKNOWN_AGE if value is None else int(value)
+
+
+_roster: Optional[RosterStore] = None
+
+
+def enable() -> RosterStore:
+    # Load a snapshot that StudentService keeps current as it writes
+    global _roster
+    _roster = RosterStore.load()
+    return _roster
+
+
+def disable():
+    global _roster
+    _roster = None
+
+
+def get_roster() -> Optional[RosterStore]:
+    return _roster
+
+
+def enable_from_env() -> Optional[RosterStore]:
+    # SHS_ROSTER=1 keeps a columnar roster for analytics
+    if os.environ.get("SHS_ROSTER") != "1":
+        return None
+    return enable()
@@ -1,202 +1,432 @@
-from datetime import date
-from PyQt6.QtWidgets import QMessageBox
-from typing import List, Dict, Any, Optional
-from app.items.models import RegisteredStudent, EnrolledStudent
-from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo, DeletionBlockedError, RepositoryError
+import sqlite3
+import time
+from typing import List, Dict, Any, FrozenSet, Iterable, Optional, Tuple
+from app.core.db import read_connection, read_transaction
+from app.items.models import (RegisteredStudent, RegisteredRow, RegisteredStatusRow, EnrolledStudent,
+                              EnrollmentStats, Page)
+from app.items.repository import (RegisteredStudentRepo, EnrolledStudentRepo, StatsRepo,
+                                  DeletionBlockedError, RepositoryError)
+from app.items.results import (Result, BulkResult, RowError, ServiceError,
+                               VALIDATION, BLOCKED, NOT_FOUND, DUPLICATE, DATABASE)
+from app.items.validation import (ValidationIssue, age_from_iso, combine_issues, normalize_student,
+                                  student_issues, validate_students)
+from app.items.exporter import export_registered, export_enrolled
+from app.items.write_queue import get_write_queue
+from app.items.cache import CacheStats, student_cache
+from app.items.roster import RosterStore, get_roster
+from app.items.events import (ChangeEvent, change_bus, INSERT, UPDATE, DELETE, RESET,
+                              REGISTERED, ENROLLED)
+
+# Records written per transaction by the bulk operations
+BULK_CHUNK_SIZE = 1000
+
+# Seconds a registration or enrollment waits for its group commit
+QUEUED_WRITE_TIMEOUT = 30.0
 
 
 class StudentService:
-    """Handles student registration, update, deletion, enrollment, and filtering."""
+    """Handles student registration, update, deletion, enrollment, and filtering.
+
+    GUI-free: operations return Result/BulkResult objects instead of showing
+    dialogs. app.gui.service_dialogs.StudentDialogs puts the Qt message boxes
+    back on top for the desktop app.
+    """
 
     @classmethod
     def calculate_age_from_iso(cls, birth_iso: str) -> Optional[int]:
         # Calculate age from ISO date string
-        try:
-            if not birth_iso:
-                return None
-            y, m, d = [int(x) for x in birth_iso.split("-")]
-            today = date.today()
-            return today.year - y - ((today.month, today.day) < (m, d))
-        except Exception:
-            return None
-
-    @classmethod
-    def register_student(cls, student: RegisteredStudent, parent=None) -> Optional[str]:
-        # Validate required fields
-        required = {
-            "First Name": student.first_name,
-            "Last Name": student.last_name,
-            "Gender": student.gender,
-            "Birth Date": student.birth_date,
-            "Age": student.age,
-            "Contact": student.contact,
-            "Guardian Name": student.guardian_name,
-            "Guardian Contact": student.guardian_contact
-        }
-        missing = [k for k, v in required.items() if v is None or str(v).strip() == ""]
-        if missing:
-            QMessageBox.warning(parent, "Missing Information", "Please fill in: " + ", ".join(missing))
-            return None
-
-        # Validate age
-        age = int(student.age)
-        if age < 16:
-            QMessageBox.warning(parent, "Age Restriction",
-                                "Student must be at least 16 years old to enroll in Senior High School.")
-            return None
-
-        # Validate contact numbers
-        if not (student.contact.isdigit() and len(student.contact) == 11):
-            QMessageBox.warning(parent, "Invalid Input", "Student contact number must be exactly 11 digits.")
-            return None
-        if not (student.guardian_contact.isdigit() and len(student.guardian_contact) == 11):
-            QMessageBox.warning(parent, "Invalid Input", "Guardian contact number must be exactly 11 digits.")
-            return None
-
-        # Add student to repo
-        try:
-            new_id = RegisteredStudentRepo.add(student)
-            QMessageBox.information(parent, "Success", "Student registered successfully!")
-            return new_id
-        except RepositoryError as e:
-            QMessageBox.critical(parent, "Repository Error", str(e))
-            return None
-        except Exception as e:
-            QMessageBox.critical(parent, "Database Error", f"Failed to register student:\n{e}")
-            return None
+        return age_from_iso(birth_iso)
+
+    @classmethod
+    def validate_registration(cls, student: RegisteredStudent) -> Optional[ValidationIssue]:
+        # Check a registration form without touching the database; every
+        # broken rule is reported in the one issue
+        return combine_issues(student_issues(student))
 
     @classmethod
     def list_registered(cls) -> List[RegisteredStudent]:
         # Return all registered students
         return RegisteredStudentRepo.get_all()
 
+    @classmethod
+    def list_registered_rows(cls) -> List[RegisteredRow]:
+        # All registered students as read-only rows, for tables and lists
+        return RegisteredStudentRepo.get_rows()
+
+    @classmethod
+    def list_registered_status(cls, status: Optional[str] = None) -> List[RegisteredStatusRow]:
+        # Registered students with grade/strand (None if not enrolled) in a
+        # single query; status "enrolled"/"unenrolled" filters in the database
+        return RegisteredStudentRepo.get_status_rows(status)
+
+    @classmethod
+    def page_registered(cls, after_key: Optional[str] = None, limit: int = 100, order_by: str = "id") -> Page:
+        # One page of registered students; pass page.next_key to get the next
+        return RegisteredStudentRepo.get_page(after_key, limit, order_by)
+
     @classmethod
     def get_registered(cls, sid: str) -> Optional[RegisteredStudent]:
-        # Get student by ID
-        return RegisteredStudentRepo.get(sid)
-
-    @classmethod
-    def update_registered(cls, student: RegisteredStudent, parent=None) -> bool:
-        # Validate fields before update
-        required = {
-            "First Name": student.first_name,
-            "Last Name": student.last_name,
-            "Gender": student.gender,
-            "Birth Date": student.birth_date,
-            "Age": student.age,
-            "Contact": student.contact,
-            "Guardian Name": student.guardian_name,
-            "Guardian Contact": student.guardian_contact
-        }
-        missing = [k for k, v in required.items() if v is None or str(v).strip() == ""]
-        if missing:
-            QMessageBox.warning(parent, "Missing Information", "Please fill in: " + ", ".join(missing))
-            return False
-
-        # Validate age and contacts
-        age = int(student.age)
-        if age < 16:
-            QMessageBox.warning(parent, "Age Restriction",
-                                "Student must be at least 16 years old to enroll in Senior High School.")
-            return False
-        if not (student.contact.isdigit() and len(student.contact) == 11):
-            QMessageBox.warning(parent, "Invalid Input", "Student contact number must be exactly 11 digits.")
-            return False
-        if not (student.guardian_contact.isdigit() and len(student.guardian_contact) == 11):
-            QMessageBox.warning(parent, "Invalid Input", "Guardian contact number must be exactly 11 digits.")
-            return False
-
-        # Update student in repo
+        # Get student by ID (cached)
+        return student_cache.get_registered(sid)
+
+    @classmethod
+    def search_registered(cls, q: str) -> List[RegisteredStudent]:
+        # Search students by name/contact
+        return RegisteredStudentRepo.search(q)
+
+    @classmethod
+    def search_registered_status(cls, q: str, status: Optional[str] = None) -> List[RegisteredStatusRow]:
+        # search_registered() with each student's grade/strand, in one query
+        return RegisteredStudentRepo.search_status_rows(q, status)
+
+    # ------------------ Enrolled Student Operations ------------------
+
+    @classmethod
+    def list_enrolled(cls, grade_level: str = None, strand: str = None) -> List[Dict[str, Any]]:
+        # List enrolled students with full names, optionally by grade/strand
+        if grade_level or strand:
+            return list(EnrolledStudentRepo.iter_all(grade_level, strand))
+        return EnrolledStudentRepo.get_all()
+
+    @classmethod
+    def page_enrolled(cls, after_key: Optional[str] = None, limit: int = 100, order_by: str = "id",
+                      grade_level: str = None, strand: str = None) -> Page:
+        # One page of enrolled students, optionally filtered by grade/strand
+        return EnrolledStudentRepo.get_page(after_key, limit, order_by, grade_level, strand)
+
+    @classmethod
+    def filter_enrolled(cls, grade_level: str = None, strand: str = None):
+        # Filter enrolled students by grade or strand
+        return EnrolledStudentRepo.filter(grade_level, strand)
+
+    @classmethod
+    def get_enrollment_stats(cls) -> EnrollmentStats:
+        # Totals and per-grade/strand/gender counts for the dashboard
+        return StatsRepo.get_stats()
+
+    @classmethod
+    def enrollment_report(cls, grade_level: str = None,
+                          strand: str = None) -> Tuple[EnrollmentStats, List[Dict[str, Any]]]:
+        # Totals and the enrolled roster from the same snapshot, so the
+        # counts always add up to the rows listed
+        with read_transaction(read_connection()):
+            return StatsRepo.get_stats(), cls.list_enrolled(grade_level, strand)
+
+    # ------------------ Operations with result objects ------------------
+
+    @classmethod
+    def register(cls, student: RegisteredStudent) -> Result[str]:
+        # Validate and add one student; the value is the new student id
+        issue = cls.validate_registration(student)
+        if issue:
+            return Result.failure(VALIDATION, issue.title, issue.message)
         try:
-            RegisteredStudentRepo.update(student.id, student)
-            QMessageBox.information(parent, "Success", "Student information updated successfully!")
-            return True
+            return Result.success(cls.add_registered(student))
         except RepositoryError as e:
-            QMessageBox.critical(parent, "Repository Error", str(e))
-            return False
+            return Result.failure(DATABASE, "Repository Error", str(e))
         except Exception as e:
-            QMessageBox.critical(parent, "Database Error", f"Failed to update student:\n{e}")
-            return False
+            return Result.failure(DATABASE, "Database Error", f"Failed to register student:\n{e}")
 
     @classmethod
-    def delete_registered(cls, student_id: str, parent=None) -> bool:
-        # Delete student, check if enrolled
+    def update(cls, student: RegisteredStudent) -> Result[bool]:
+        issue = cls.validate_registration(student)
+        if issue:
+            return Result.failure(VALIDATION, issue.title, issue.message)
         try:
-            deleted = RegisteredStudentRepo.delete(student_id)
-            if deleted and parent:
-                QMessageBox.information(parent, "Deleted", "Student information deleted successfully!")
-            return deleted
+            return Result.success(cls.save_registered(student))
+        except RepositoryError as e:
+            return Result.failure(DATABASE, "Repository Error", str(e))
+        except Exception as e:
+            return Result.failure(DATABASE, "Database Error", f"Failed to update student:\n{e}")
+
+    @classmethod
+    def delete(cls, student_id: str) -> Result[bool]:
+        # Value is False when there was no such student
+        try:
+            return Result.success(cls.remove_registered(student_id))
         except DeletionBlockedError:
-            if parent:
-                QMessageBox.warning(parent, "Cannot Delete", "This student is currently enrolled. Drop student first.")
-            return False
+            return Result.failure(BLOCKED, "Cannot Delete", "This student is currently enrolled. Drop student first.")
         except Exception as e:
-            if parent:
-                QMessageBox.critical(parent, "Error", f"Deletion failed:\n{e}")
-            return False
+            return Result.failure(DATABASE, "Error", f"Deletion failed:\n{e}")
 
     @classmethod
-    def search_registered(cls, q: str) -> List[RegisteredStudent]:
-        # Search students by name/contact
-        return RegisteredStudentRepo.search(q)
+    def enroll(cls, enrollment: EnrolledStudent) -> Result[str]:
+        issue = _enrollment_issue(enrollment.grade_level, enrollment.strand)
+        if issue:
+            return Result(error=issue)
+        try:
+            return Result.success(cls.add_enrollment(enrollment))
+        except Exception as e:
+            return Result(error=_enrollment_error(e))
 
-    # ------------------ Enrolled Student Operations ------------------
+    @classmethod
+    def change_enrollment(cls, eid: str, grade: str, strand: str) -> Result[bool]:
+        # Move an enrolled student to another grade and/or strand
+        issue = _enrollment_issue(grade, strand)
+        if issue:
+            return Result(error=issue)
+        try:
+            if not cls.save_enrollment(eid, grade, strand):
+                return Result.failure(NOT_FOUND, "Not Found", "Enrollment not found!")
+            return Result.success(True)
+        except Exception as e:
+            return Result.failure(DATABASE, "Error", f"Update failed:\n{e}")
 
     @classmethod
-    def enroll_student(cls, enrollment: EnrolledStudent, parent=None) -> Optional[str]:
-        # Enroll a student
+    def drop(cls, eid: str) -> Result[bool]:
         try:
-            eid = EnrolledStudentRepo.enroll(enrollment)
-            if parent:
-                QMessageBox.information(parent, "Success", "Student successfully enrolled!")
-            return eid
+            if not cls.remove_enrollment(eid):
+                return Result.failure(NOT_FOUND, "Not Found", "Enrollment not found!")
+            return Result.success(True)
         except Exception as e:
-            if parent:
-                QMessageBox.critical(parent, "Enrollment Error", "Student Already Enrolled")
-            return None
+            return Result.failure(DATABASE, "Error", f"Deletion failed:\n{e}")
 
     @classmethod
-    def list_enrolled(cls) -> List[Dict[str, Any]]:
-        # List all enrolled students
-        return EnrolledStudentRepo.get_all()
+    def export_registered(cls, path: str) -> Result[int]:
+        # Export all registered students to CSV, JSON Lines or XLSX; value is the row count
+        try:
+            return Result.success(cls.write_registered_export(path))
+        except Exception as e:
+            return Result.failure(DATABASE, "Export Error", f"Export failed:\n{e}")
 
     @classmethod
-    def update_enrollment(cls, eid: str, grade: str, strand: str, parent=None) -> bool:
-        # Update enrolled student's grade/strand
-        if not grade or not strand:
-            if parent:
-                QMessageBox.warning(parent, "Missing Information", "Grade and strand are required.")
-            return False
+    def export_enrolled(cls, path: str, grade_level: str = None, strand: str = None) -> Result[int]:
+        # Export enrolled students, optionally filtered by grade/strand
         try:
-            updated = EnrolledStudentRepo.update(eid, grade, strand)
-            if parent:
-                if updated:
-                    QMessageBox.information(parent, "Updated", "Student updated successfully!")
-                else:
-                    QMessageBox.warning(parent, "Not Found", "Enrollment not found!")
-            return updated
+            return Result.success(cls.write_enrolled_export(path, grade_level, strand))
         except Exception as e:
-            if parent:
-                QMessageBox.critical(parent, "Error", f"Update failed:\n{e}")
-            return False
+            return Result.failure(DATABASE, "Export Error", f"Export failed:\n{e}")
+
+    # ------------------ Bulk operations ------------------
+    # Every record is validated up front; valid ones are written in chunked
+    # transactions. A chunk that breaks a constraint is retried row by row so
+    # one bad record only costs itself. Errors come back per input index.
+
+    @classmethod
+    def register_many(cls, students: Iterable[RegisteredStudent],
+                      chunk_size: int = BULK_CHUNK_SIZE) -> BulkResult:
+        result = BulkResult()
+        start = time.perf_counter()
+        batch: List[Tuple[int, RegisteredStudent]] = []
+        for index, student in enumerate(students):
+            result.total += 1
+            batch.append((index, normalize_student(student)))
+            if len(batch) >= chunk_size:
+                cls._write_registrations(batch, result)
+                batch = []
+        if batch:
+            cls._write_registrations(batch, result)
+        if result.ids:
+            change_bus.publish(ChangeEvent(RESET, REGISTERED))
+        result.errors.sort(key=lambda e: e.index)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    @classmethod
+    def enroll_many(cls, enrollments: Iterable[EnrolledStudent],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> BulkResult:
+        result = BulkResult()
+        start = time.perf_counter()
+        batch: List[Tuple[int, EnrolledStudent]] = []
+        try:
+            for index, enrollment in enumerate(enrollments):
+                result.total += 1
+                issue = _enrollment_issue(enrollment.grade_level, enrollment.strand)
+                if issue:
+                    result.errors.append(RowError(index, enrollment, issue))
+                    continue
+                batch.append((index, enrollment))
+                if len(batch) >= chunk_size:
+                    cls._flush_enrollments(batch, result)
+                    batch = []
+            if batch:
+                cls._flush_enrollments(batch, result)
+        finally:
+            student_cache.invalidate_enrolled()
+            if result.ids:
+                change_bus.publish(ChangeEvent(RESET, ENROLLED))
+        result.errors.sort(key=lambda e: e.index)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    @classmethod
+    def _write_registrations(cls, batch: List[Tuple[int, RegisteredStudent]], result: BulkResult):
+        # Validate the chunk column by column, then write what passed
+        issues = validate_students([s for _, s in batch])
+        valid = []
+        for pos, (index, student) in enumerate(batch):
+            if pos in issues:
+                issue = combine_issues(issues[pos])
+                result.errors.append(RowError(index, student, ServiceError(VALIDATION, issue.title, issue.message)))
+            else:
+                valid.append((index, student))
+        if valid:
+            cls._flush_registrations(valid, result)
 
     @classmethod
-    def delete_enrolled(cls, eid: str, parent=None) -> bool:
-        # Delete enrolled student
+    def _flush_registrations(cls, batch: List[Tuple[int, RegisteredStudent]], result: BulkResult):
+        try:
+            ids = RegisteredStudentRepo.add_many([s for _, s in batch])
+            written = list(zip(ids, (s for _, s in batch)))
+        except RepositoryError:
+            written = []
+            for index, student in batch:
+                try:
+                    written.append((RegisteredStudentRepo.add(student), student))
+                except RepositoryError as e:
+                    result.errors.append(RowError(index, student, ServiceError(DATABASE, "Repository Error", str(e))))
+        roster = get_roster()
+        for sid, student in written:
+            student_cache.invalidate_registered(sid)
+            if roster is not None:
+                roster.add(sid, student)
+        result.ids.extend(sid for sid, _ in written)
+
+    @classmethod
+    def _flush_enrollments(cls, batch: List[Tuple[int, EnrolledStudent]], result: BulkResult):
+        try:
+            EnrolledStudentRepo.enroll_many([e for _, e in batch])
+            written = [e for _, e in batch]
+        except RepositoryError:
+            written = []
+            for index, enrollment in batch:
+                try:
+                    EnrolledStudentRepo.enroll(enrollment)
+                    written.append(enrollment)
+                except Exception as e:
+                    result.errors.append(RowError(index, enrollment, _enrollment_error(e)))
+        roster = get_roster()
+        if roster is not None:
+            for e in written:
+                roster.enroll(e.id, e.grade_level, e.strand)
+        result.ids.extend(e.id for e in written)
+
+    # ------------------ Background-safe operations ------------------
+    # No dialogs and no swallowed errors: these raise, so GUI workers can run
+    # them off the UI thread and report the outcome back on it.
+
+    @classmethod
+    def add_registered(cls, student: RegisteredStudent) -> str:
+        # Joins a group commit when the write queue is enabled
+        student = normalize_student(student)
+        writes = get_write_queue()
+        sid = writes.register(student, QUEUED_WRITE_TIMEOUT) if writes else RegisteredStudentRepo.add(student)
+        student_cache.invalidate_registered(sid)
+        roster = get_roster()
+        if roster is not None:
+            roster.add(sid, student)
+        change_bus.publish(ChangeEvent(INSERT, REGISTERED, sid, RegisteredRow.from_student(student)._replace(id=sid)))
+        return sid
+
+    @classmethod
+    def save_registered(cls, student: RegisteredStudent) -> bool:
+        student = normalize_student(student)
+        try:
+            updated = RegisteredStudentRepo.update(student.id, student)
+        finally:
+            student_cache.invalidate_registered(student.id)
+        roster = get_roster()
+        if updated and roster is not None:
+            roster.add(student.id, student)
+        if updated:
+            change_bus.publish(ChangeEvent(UPDATE, REGISTERED, student.id, RegisteredRow.from_student(student)))
+        return updated
+
+    @classmethod
+    def remove_registered(cls, student_id: str) -> bool:
+        # Raises DeletionBlockedError while the student is enrolled
+        try:
+            deleted = RegisteredStudentRepo.delete(student_id)
+        finally:
+            student_cache.invalidate_registered(student_id)
+        roster = get_roster()
+        if deleted and roster is not None:
+            roster.remove(student_id)
+        if deleted:
+            change_bus.publish(ChangeEvent(DELETE, REGISTERED, student_id))
+        return deleted
+
+    @classmethod
+    def add_enrollment(cls, enrollment: EnrolledStudent) -> str:
+        writes = get_write_queue()
+        try:
+            eid = writes.enroll(enrollment, QUEUED_WRITE_TIMEOUT) if writes else EnrolledStudentRepo.enroll(enrollment)
+        finally:
+            student_cache.invalidate_enrolled()
+        roster = get_roster()
+        if roster is not None:
+            roster.enroll(eid, enrollment.grade_level, enrollment.strand)
+        change_bus.publish(ChangeEvent(INSERT, ENROLLED, eid,
+                                       _enrolled_row(eid, enrollment.grade_level, enrollment.strand)))
+        return eid
+
+    @classmethod
+    def save_enrollment(cls, eid: str, grade: str, strand: str) -> bool:
+        updated = EnrolledStudentRepo.update(eid, grade, strand)
+        roster = get_roster()
+        if updated and roster is not None:
+            roster.enroll(eid, grade, strand)
+        if updated:
+            change_bus.publish(ChangeEvent(UPDATE, ENROLLED, eid, _enrolled_row(eid, grade, strand)))
+        return updated
+
+    @classmethod
+    def remove_enrollment(cls, eid: str) -> bool:
         try:
             deleted = EnrolledStudentRepo.delete(eid)
-            if parent:
-                if deleted:
-                    QMessageBox.information(parent, "Student dropped", "Student record dropped successfully!")
-                else:
-                    QMessageBox.warning(parent, "Not Found", "Enrollment not found!")
-            return deleted
-        except Exception as e:
-            if parent:
-                QMessageBox.critical(parent, "Error", f"Deletion failed:\n{e}")
-            return False
+        finally:
+            student_cache.invalidate_enrolled()
+        roster = get_roster()
+        if deleted and roster is not None:
+            roster.drop(eid)
+        if deleted:
+            change_bus.publish(ChangeEvent(DELETE, ENROLLED, eid))
+        return deleted
 
     @classmethod
-    def filter_enrolled(cls, grade_level: str = None, strand: str = None):
-        # Filter enrolled students by grade or strand
-        return EnrolledStudentRepo.filter(grade_level, strand)
+    def enrolled_ids(cls) -> FrozenSet[str]:
+        # IDs of every enrolled student, for the registration status column (cached)
+        return student_cache.enrolled_ids()
+
+    @classmethod
+    def roster(cls) -> RosterStore:
+        # Columnar roster for analytics: the live one when enabled, else a
+        # fresh snapshot
+        return get_roster() or RosterStore.load()
+
+    @classmethod
+    def cache_stats(cls) -> CacheStats:
+        return student_cache.stats()
+
+    @classmethod
+    def write_registered_export(cls, path: str) -> int:
+        return export_registered(path)
+
+    @classmethod
+    def write_enrolled_export(cls, path: str, grade_level: str = None, strand: str = None) -> int:
+        return export_enrolled(path, grade_level=grade_level, strand=strand)
+
+
+def _enrollment_issue(grade: str, strand: str) -> Optional[ServiceError]:
+    if not grade or not strand:
+        return ServiceError(VALIDATION, "Missing Information", "Grade and strand are required.")
+    return None
+
+
+def _enrollment_error(e: Exception) -> ServiceError:
+    # enroll() reports a missing student as RepositoryError and a second
+    # enrollment of the same student as a constraint failure
+    if isinstance(e, sqlite3.IntegrityError):
+        return ServiceError(DUPLICATE, "Enrollment Error", "Student Already Enrolled")
+    if isinstance(e, RepositoryError):
+        return ServiceError(NOT_FOUND, "Enrollment Error", str(e))
+    return ServiceError(DATABASE, "Enrollment Error", f"Enrollment failed:\n{e}")
+
+
+def _enrolled_row(eid: str, grade: str, strand: str) -> tuple:
+    # Enrolled table row for a change event; the name comes from the cache
+    student = student_cache.get_registered(eid)
+    full_name = ""
+    if student:
+        full_name = f"{student.first_name} {student.middle_name or ''} {student.last_name}".replace("  ", " ").strip()
+    return (eid, full_name, grade, strand)
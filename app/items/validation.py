@@ -0,0 +1,196 @@
+import re
+from dataclasses import replace
+from datetime import date
+from itertools import compress
+from operator import attrgetter, not_
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.items.models import RegisteredStudent
+
+MIN_AGE = 16
+
+# A complete PH mobile number in any accepted spelling: 09XXXXXXXXX,
+# +639XXXXXXXXX, 639XXXXXXXXX, or 9XXXXXXXXX (spreadsheets drop the 0),
+# optionally broken up by these separators
+_PHONE = re.compile(r"(?:0|\+?63)?(9\d{9})")
+_SEPARATORS = " -()."
+_PHONE_SEPARATORS = str.maketrans("", "", _SEPARATORS)
+# What the contact fields let the user type: only the characters
+# normalize_phone() reads, which alone decides whether the number is valid
+PHONE_INPUT_PATTERN = rf"^[\d+{re.escape(_SEPARATORS)}]{{0,20}}$"
+
+
+class ValidationIssue(NamedTuple):
+    title: str
+    message: str
+    field: Optional[str] = None
+
+
+def age_from_iso(birth_iso: str) -> Optional[int]:
+    # Calculate age from ISO date string
+    try:
+        if not birth_iso:
+            return None
+        y, m, d = [int(x) for x in birth_iso.split("-")]
+        today = date.today()
+        return today.year - y - ((today.month, today.day) < (m, d))
+    except Exception:
+        return None
+
+
+def normalize_phone(value: Any) -> Optional[str]:
+    # Canonical 09XXXXXXXXX form, or None when it is not a mobile number
+    if value is None:
+        return None
+    match = _PHONE.fullmatch(str(value).translate(_PHONE_SEPARATORS))
+    return "0" + match.group(1) if match else None
+
+
+def is_valid_contact(value: Optional[str]) -> bool:
+    return normalize_phone(value) is not None
+
+
+def _is_blank(value: Any) -> bool:
+    if value is None:
+        return True
+    if type(value) is str:
+        return not value.strip()
+    return str(value).strip() == ""
+
+
+def _is_whole_number(value: Any) -> bool:
+    try:
+        int(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class Check(NamedTuple):
+    test: Callable[[Any], bool]
+    title: str
+    message: str
+
+
+class Field(NamedTuple):
+    name: str
+    label: str
+    required: bool = False
+    checks: Tuple[Check, ...] = ()              # run in order, only on non-blank values
+    normalize: Optional[Callable[[Any], Any]] = None  # None result keeps the raw value
+
+
+class Schema:
+    """Declarative rules for one record type, compiled into flat plans.
+
+    Required fields are reported together as one "Missing Information"
+    issue; each field's checks stop at the first that fails, so a field
+    contributes at most one further issue. validate() reports everything
+    for one record and validate_columns() runs each rule down a whole
+    column for batches.
+    """
+
+    def __init__(self, fields: Sequence[Field]):
+        self.fields = tuple(fields)
+        self._required = tuple((attrgetter(f.name), f.label) for f in self.fields if f.required)
+        self._checks = tuple((attrgetter(f.name), f.name, f.checks) for f in self.fields if f.checks)
+        self._normalizers = tuple((attrgetter(f.name), f.name, f.normalize)
+                                  for f in self.fields if f.normalize)
+
+    def normalize(self, record):
+        # Same record with canonical field values (a copy only if any changed)
+        changes = {}
+        for get, name, normalize in self._normalizers:
+            value = get(record)
+            normalized = normalize(value)
+            if normalized is not None and normalized != value:
+                changes[name] = normalized
+        return replace(record, **changes) if changes else record
+
+    def validate(self, record) -> List[ValidationIssue]:
+        missing = [label for get, label in self._required if _is_blank(get(record))]
+        issues = [_missing_issue(missing)] if missing else []
+        for get, name, checks in self._checks:
+            value = get(record)
+            if _is_blank(value):
+                continue
+            for check in checks:
+                if not check.test(value):
+                    issues.append(ValidationIssue(check.title, check.message, name))
+                    break
+        return issues
+
+    def validate_many(self, records: Sequence) -> Dict[int, List[ValidationIssue]]:
+        # Issues per record index; valid records are absent
+        columns = {f.name: list(map(attrgetter(f.name), records)) for f in self.fields}
+        return self.validate_columns(columns, len(records))
+
+    def validate_columns(self, columns: Dict[str, Sequence], size: int) -> Dict[int, List[ValidationIssue]]:
+        # Same rules as validate(), one column at a time
+        missing: Dict[int, List[str]] = {}
+        for f in self.fields:
+            if f.required:
+                for i in compress(range(size), map(_is_blank, columns[f.name])):
+                    missing.setdefault(i, []).append(f.label)
+        issues = {i: [_missing_issue(labels)] for i, labels in missing.items()}
+        for _, name, checks in self._checks:
+            column = columns[name]
+            pending = list(compress(range(size), map(not_, map(_is_blank, column))))
+            for check in checks:
+                if not pending:
+                    break
+                passed = list(map(check.test, [column[i] for i in pending]))
+                issue = ValidationIssue(check.title, check.message, name)
+                for i in compress(pending, map(not_, passed)):
+                    issues.setdefault(i, []).append(issue)
+                pending = list(compress(pending, passed))
+        return issues
+
+
+def _missing_issue(labels: List[str]) -> ValidationIssue:
+    return ValidationIssue("Missing Information", "Please fill in: " + ", ".join(labels))
+
+
+def _phone_check(whose: str) -> Check:
+    return Check(is_valid_contact, "Invalid Input",
+                 f"{whose} contact number must be an 11-digit mobile number (09XXXXXXXXX or +639XXXXXXXXX).")
+
+
+STUDENT_SCHEMA = Schema([
+    Field("first_name", "First Name", required=True),
+    Field("middle_name", "Middle Name"),
+    Field("last_name", "Last Name", required=True),
+    Field("gender", "Gender", required=True),
+    Field("birth_date", "Birth Date", required=True),
+    Field("age", "Age", required=True, checks=(
+        Check(_is_whole_number, "Invalid Input", "Age must be a whole number."),
+        Check(lambda v: int(v) >= MIN_AGE, "Age Restriction",
+              "Student must be at least 16 years old to enroll in Senior High School."),
+    )),
+    Field("contact", "Contact", required=True, checks=(_phone_check("Student"),),
+          normalize=normalize_phone),
+    Field("guardian_name", "Guardian Name", required=True),
+    Field("guardian_contact", "Guardian Contact", required=True, checks=(_phone_check("Guardian"),),
+          normalize=normalize_phone),
+])
+
+
+def student_issues(student: RegisteredStudent) -> List[ValidationIssue]:
+    # Every rule the student breaks
+    return STUDENT_SCHEMA.validate(student)
+
+
+def combine_issues(issues: List[ValidationIssue]) -> Optional[ValidationIssue]:
+    # One issue for a dialog or error row: the first title, every message
+    if not issues:
+        return None
+    if len(issues) == 1:
+        return issues[0]
+    return ValidationIssue(issues[0].title, "\n".join(i.message for i in issues))
+
+
+def validate_students(students: Sequence[RegisteredStudent]) -> Dict[int, List[ValidationIssue]]:
+    return STUDENT_SCHEMA.validate_many(students)
+
+
+def normalize_student(student: RegisteredStudent) -> RegisteredStudent:
+    return STUDENT_SCHEMA.normalize(student)
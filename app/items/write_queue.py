@@ -0,0 +1,221 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+from app.core.db import connect, generate_next_id
+from app.items.models import RegisteredStudent, EnrolledStudent
+from app.items.repository import RepositoryError, INSERT_REGISTERED_SQL, _insert_params
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Coalesces registrations and enrollments into group commits.
+
+    Writes are handed to one background thread with its own connection,
+    which applies up to `max_batch` pending writes in a single transaction,
+    each inside its own savepoint so one bad row fails alone. Writes that
+    arrive while a commit is being flushed go into the next one; `max_delay`
+    (seconds) optionally lingers after the first write for more to arrive.
+    The connection runs with synchronous=FULL and a caller's Future only
+    resolves after COMMIT returns, so an acknowledged write is on disk.
+    """
+
+    def __init__(self, max_delay: float = 0.0, max_batch: int = 256, db_name: str = None):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.db_name = db_name
+        self.commits = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        # Guards _closed and enqueueing, so nothing lands behind _STOP
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread.start()
+
+    def submit(self, op: Callable[[sqlite3.Cursor], object]) -> Future:
+        # Queue op(cursor) to run inside the next group commit
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RepositoryError("The write queue has been closed.")
+            self._queue.put((op, future))
+        return future
+
+    def submit_registration(self, student: RegisteredStudent) -> Future:
+        return self.submit(lambda cur: _register(cur, student))
+
+    def submit_enrollment(self, enrollment: EnrolledStudent) -> Future:
+        return self.submit(lambda cur: _enroll(cur, enrollment))
+
+    def register(self, student: RegisteredStudent, timeout: float = None) -> str:
+        # Blocking form of submit_registration(): the new student id
+        return _wait(self.submit_registration(student), timeout)
+
+    def enroll(self, enrollment: EnrolledStudent, timeout: float = None) -> str:
+        return _wait(self.submit_enrollment(enrollment), timeout)
+
+    def close(self, timeout: float = None):
+        # Commit everything already queued, then stop the worker
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            conn = connect(self.db_name, synchronous="FULL")
+        except sqlite3.Error as e:
+            self._fail_pending(RepositoryError(f"Could not open the database for queued writes: {e}"))
+            return
+        batch = []
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+            # Whatever the loop left unresolved (all of it, if it died)
+            error = RepositoryError("The write queue stopped before the write was committed.")
+            _fail_batch(batch, error)
+            self._fail_pending(error)
+
+    def _fail_pending(self, error: Exception):
+        with self._lock:
+            self._closed = True
+        # No submit() can enqueue past this point
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                _fail_batch([item], error)
+
+    def _commit(self, conn: sqlite3.Connection, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            for op, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cur.execute("SAVEPOINT queued_write")
+                try:
+                    result = op(cur)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO queued_write")
+                    results.append((future, None, e))
+                else:
+                    results.append((future, result, None))
+                cur.execute("RELEASE queued_write")
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            # Fail the whole batch, including writes the loop never reached
+            # (all of them when BEGIN itself timed out on a lock)
+            _fail_batch(batch, RepositoryError(f"Database error while committing queued writes: {e}"))
+            return
+        self.commits += 1
+        self.writes += len(results)
+        # Only now, after COMMIT, are the writes acknowledged
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def _fail_batch(batch, error: Exception):
+    for op, future in batch:
+        if future.done():
+            continue
+        if future.running() or future.set_running_or_notify_cancel():
+            future.set_exception(error)
+
+
+def _wait(future: Future, timeout: Optional[float]):
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        # Still queued: withdraw it, so a write reported as failed never lands
+        if future.cancel():
+            raise RepositoryError("Timed out waiting for the write queue; nothing was written.")
+        # Already inside a commit, which busy_timeout bounds
+        return future.result()
+
+
+# The queued ops raise exactly what the repository methods they replace
+# raise, so callers map errors the same way whether the queue is on or off.
+
+def _register(cur: sqlite3.Cursor, student: RegisteredStudent) -> str:
+    # As RegisteredStudentRepo.add()
+    try:
+        new_id = student.id or generate_next_id("registered_students", cur.connection)
+        cur.execute(INSERT_REGISTERED_SQL, _insert_params(new_id, student))
+        return new_id
+    except sqlite3.IntegrityError as e:
+        raise RepositoryError("A database constraint failed (possibly duplicate ID).") from e
+    except sqlite3.Error as e:
+        raise RepositoryError(f"Database error while adding student: {e}") from e
+
+
+def _enroll(cur: sqlite3.Cursor, enrollment: EnrolledStudent) -> str:
+    # As EnrolledStudentRepo.enroll(): a second enrollment raises the
+    # sqlite3.IntegrityError itself
+    cur.execute("SELECT 1 FROM registered_students WHERE id=? LIMIT 1", (enrollment.id,))
+    if not cur.fetchone():
+        raise RepositoryError(f"Registered student id {enrollment.id} not found.")
+    cur.execute("INSERT INTO enrolled_students (id, grade_level, strand) VALUES (?, ?, ?)",
+                (enrollment.id, enrollment.grade_level, enrollment.strand))
+    return enrollment.id
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+def enable(max_delay: float = 0.0, max_batch: int = 256) -> WriteQueue:
+    # Route StudentService registrations and enrollments through a queue
+    global _write_queue
+    disable()
+    _write_queue = WriteQueue(max_delay=max_delay, max_batch=max_batch)
+    return _write_queue
+
+
+def disable():
+    global _write_queue
+    if _write_queue is not None:
+        _write_queue.close()
+    _write_queue = None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    return _write_queue
+
+
+def enable_from_env() -> Optional[WriteQueue]:
+    # SHS_WRITE_QUEUE=1 [SHS_WRITE_QUEUE_DELAY_MS=5] turns group commits on
+    if os.environ.get("SHS_WRITE_QUEUE") != "1":
+        return None
+    return enable(max_delay=float(os.environ.get("SHS_WRITE_QUEUE_DELAY_MS") or 0) / 1000)
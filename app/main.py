@@ -1,12 +1,24 @@
 import sys
+from app.core.startup import timer
 from PyQt6.QtWidgets import QApplication
 from app.core.db import init_db
+from app.core.instrumentation import enable_from_env
+from app.core import replica
+from app.items import roster, write_queue
 from app.shell.main_window import MainWindow
 
 def main():
+    timer.mark("imports")
+    enable_from_env()
     init_db()
+    timer.mark("init_db")
+    replica.enable_from_env()
+    write_queue.enable_from_env()
+    roster.enable_from_env()
+    timer.mark("optional services")
     app = QApplication(sys.argv)
     win = MainWindow()
+    timer.mark("main window")
     win.show()
     sys.exit(app.exec())
 
@@ -3,14 +3,37 @@ from PyQt6.QtWidgets import (
     QPushButton, QStackedWidget, QFrame, QLabel
 )
 from PyQt6.QtCore import Qt
-from app.gui.registergui import RegistrationTab
-from app.gui.enrollmentgui import EnrolledTab
-from app.gui.dashboardgui import DashboardTab
+from app.core.startup import timer
+
+
+# Tab modules are imported when their page is first shown, not at start-up
+def _dashboard_tab():
+    from app.gui.dashboardgui import DashboardTab
+    return DashboardTab()
+
+
+def _registration_tab():
+    from app.gui.registergui import RegistrationTab
+    return RegistrationTab()
+
+
+def _enrolled_tab():
+    from app.gui.enrollmentgui import EnrolledTab
+    return EnrolledTab()
+
+
+# Page index -> (attribute, factory)
+PAGES = [
+    ("dashboard_tab", _dashboard_tab),
+    ("registration_tab", _registration_tab),
+    ("enrolled_tab", _enrolled_tab),
+]
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self._painted = False
         self.setWindowTitle("Justin D. Nabunturan SHS Enrollment System")
         self.setMinimumSize(1355, 650)
 
@@ -79,13 +102,12 @@ class MainWindow(QMainWindow):
         # Right content area with stacked widget
         self.content_stack = QStackedWidget()
 
-        self.dashboard_tab = DashboardTab()
-        self.registration_tab = RegistrationTab()
-        self.enrolled_tab = EnrolledTab()
-
-        self.content_stack.addWidget(self.dashboard_tab)
-        self.content_stack.addWidget(self.registration_tab)
-        self.content_stack.addWidget(self.enrolled_tab)
+        # Empty placeholders; each tab is built (and loads its data) the
+        # first time its page is shown
+        for attr, _ in PAGES:
+            setattr(self, attr, None)
+            self.content_stack.addWidget(QWidget())
+        self.page(0)
 
         # Add to main layout
         main_layout.addWidget(sidebar)
@@ -98,8 +120,22 @@ class MainWindow(QMainWindow):
         self.registration_btn.clicked.connect(lambda: self.switch_page(1))
         self.enrolled_btn.clicked.connect(lambda: self.switch_page(2))
 
-        # Connect signal: when a student is enrolled in registration tab
-        self.registration_tab.student_enrolled.connect(self.on_student_enrolled)
+    def page(self, index):
+        # The tab for a page, building it on first use
+        attr, factory = PAGES[index]
+        tab = getattr(self, attr)
+        if tab is not None:
+            return tab
+        tab = factory()
+        placeholder = self.content_stack.widget(index)
+        self.content_stack.insertWidget(index, tab)
+        if self.content_stack.currentWidget() is placeholder:
+            self.content_stack.setCurrentWidget(tab)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        setattr(self, attr, tab)
+        timer.mark(f"build {attr}")
+        return tab
 
     def switch_page(self, index):
         # Uncheck all buttons
@@ -116,9 +152,12 @@ class MainWindow(QMainWindow):
             self.enrolled_btn.setChecked(True)
 
         # Switch to the corresponding page
+        self.page(index)
         self.content_stack.setCurrentIndex(index)
 
-    def on_student_enrolled(self, data: dict):
-        # Add to enrolled tab & refresh dashboard
-        self.enrolled_tab.add_student_to_table(data)
-        self.enrolled_tab.load_enrolled()
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            timer.mark("first paint")
+            timer.report()
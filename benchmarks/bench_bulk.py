@@ -0,0 +1,55 @@
+# Throughput of the headless bulk registration and enrollment paths.
+# Usage: python -m benchmarks.bench_bulk [rows]
+import os
+import random
+import sys
+import tempfile
+import time
+from app.core import db
+from app.items.models import RegisteredStudent, EnrolledStudent
+from app.items.service import StudentService
+from benchmarks.synthetic import student_rows, GRADES, STRANDS
+
+SINGLE_ROWS = 2000
+
+
+def students(count: int, start: int = 1):
+    # Synthetic registrations without ids; every 50th has a bad contact
+    for i, r in enumerate(student_rows(count, start=start)):
+        contact = r[7] if i % 50 else "12345"
+        yield RegisteredStudent(None, r[1], r[2], r[3], r[4], r[5], r[6], contact, r[8], r[9])
+
+
+def report(name: str, result):
+    print(f"{name:<22}{result.total:>9}{result.succeeded:>9}{result.failed:>8}"
+          f"{result.seconds:>9.2f}{result.rows_per_second:>12,.0f}")
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        print(f"{'operation':<22}{'records':>9}{'ok':>9}{'errors':>8}{'seconds':>9}{'records/s':>12}")
+
+        records = list(students(rows))  # built up front so only the service is timed
+        registered = StudentService.register_many(records)
+        report("register_many", registered)
+
+        rng = random.Random(7)
+        enrollments = [EnrolledStudent(sid, rng.choice(GRADES), rng.choice(STRANDS))
+                       for sid in registered.ids[::2]]
+        enrollments += enrollments[:len(enrollments) // 100]  # duplicates, rejected per row
+        report("enroll_many", StudentService.enroll_many(enrollments))
+
+        # Baseline: the same rules one record and one transaction at a time
+        records = list(students(SINGLE_ROWS, start=rows + 1))
+        start = time.perf_counter()
+        ok = sum(StudentService.register(s).ok for s in records)
+        seconds = time.perf_counter() - start
+        print(f"{'register (one by one)':<22}{SINGLE_ROWS:>9}{ok:>9}{SINGLE_ROWS - ok:>8}"
+              f"{seconds:>9.2f}{SINGLE_ROWS / seconds:>12,.0f}")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
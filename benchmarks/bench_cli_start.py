@@ -0,0 +1,41 @@
+# Cold start of the headless CLI, measured as whole subprocess runs.
+# Usage: python -m benchmarks.bench_cli_start [runs]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from app.core import db
+from benchmarks.synthetic import populate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QT_CHECK = "import sys, app.cli; sys.exit(any(m.startswith('PyQt6') for m in sys.modules))"
+
+
+def run(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main(runs: int = 10):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db.configure(path)
+        db.init_db()
+        populate(db.get_connection(), 20000)
+        db.close_connections()
+
+        subprocess.run([sys.executable, "-c", QT_CHECK], cwd=ROOT, check=True)
+        print("app.cli imports no PyQt6 modules")
+        baseline = statistics.median(run(["-c", "pass"]) for _ in range(runs))
+        print(f"{'command':<36}{'median ms':>10}")
+        print(f"{'python -c pass':<36}{baseline * 1000:>10.0f}")
+        for args in (["--help"], ["--db", path, "stats"], ["--db", path, "search", "santos", "--limit", "5"]):
+            seconds = statistics.median(run(["-m", "app.cli"] + args) for _ in range(runs))
+            print(f"{' '.join(a if a != path else 'bench.db' for a in args):<36}{seconds * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,50 @@
+# Time the streaming roster import on a synthetic CSV.
+# Usage: python -m benchmarks.bench_import [rows]
+import csv
+import os
+import sys
+import tempfile
+import tracemalloc
+from app.core import db
+from app.items.importer import import_students
+from benchmarks.synthetic import student_rows
+
+HEADERS = ["First Name", "Middle Name", "Last Name", "Gender", "Birth Date",
+           "Contact", "Guardian Name", "Guardian Contact"]
+
+
+def write_roster(path: str, rows: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for i, r in enumerate(student_rows(rows)):
+            contact = r[7] if i % 50 else "12345"  # every 50th row is rejected
+            writer.writerow([r[1], r[2] or "", r[3], r[4], r[5], contact, r[8], r[9]])
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "roster.csv")
+        write_roster(src, rows)
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        report = import_students(src)
+
+        # Second run into a fresh database, traced, for peak Python heap
+        db.configure(os.path.join(tmp, "traced.db"))
+        db.init_db()
+        tracemalloc.start()
+        import_students(src)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"rows:      {report.total}")
+        print(f"imported:  {report.imported}")
+        print(f"rejected:  {report.rejected}")
+        print(f"seconds:   {report.seconds:.2f} ({report.rows_per_second:,.0f} rows/s)")
+        print(f"peak heap: {peak / 1024 / 1024:.1f} MB")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,46 @@
+# Time columnar roster analytics over a synthetic roster.
+# Usage: python -m benchmarks.bench_roster [rows]
+import os
+import sys
+import tempfile
+import time
+from app.core import db
+from app.items.roster import RosterStore
+from benchmarks.synthetic import populate
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        populate(db.get_connection(), rows)
+
+        load_t, store = timed(RosterStore.load, repeat=1)
+        print(f"{len(store)} students, loaded in {load_t * 1000:.0f} ms")
+        cases = [
+            ("grade x strand", lambda: store.crosstab("grade_level", "strand", enrolled=True)),
+            ("gender by grade", lambda: store.group_count(["gender", "grade_level"])),
+            ("STEM 11 ids", lambda: store.filter(grade_level="11", strand="STEM")),
+            ("unenrolled", lambda: store.count(enrolled=False)),
+            ("age histogram", lambda: store.histogram("age", enrolled=True)),
+            ("birth years 16-18", lambda: store.histogram("birth_date", min_age=16, max_age=18)),
+        ]
+        print(f"{'query':<20}{'ms':>8}")
+        for name, fn in cases:
+            seconds, _ = timed(fn)
+            print(f"{name:<20}{seconds * 1000:>8.2f}")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
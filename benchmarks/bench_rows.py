@@ -0,0 +1,79 @@
+# Decode time and memory of registered_students rows per representation.
+# Usage: python -m benchmarks.bench_rows [rows]
+#
+# The representations differ in decode time, not much in memory: about nine
+# str objects per row (~550 of ~650 bytes) are held whichever container
+# points at them, and slots only save the per-instance __dict__.
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+from app.core import db
+from app.items.repository import RegisteredStudentRepo, REGISTERED_SELECT
+from benchmarks.synthetic import populate
+
+
+@dataclass
+class DictStudent:
+    # The pre-slots model, for comparison
+    id: Optional[str]
+    first_name: str
+    middle_name: Optional[str]
+    last_name: str
+    gender: str
+    birth_date: str
+    age: int
+    contact: str
+    guardian_name: str
+    guardian_contact: str
+
+
+def legacy_get_all():
+    # sqlite3.Row -> dict -> keyword construction, as get_all() used to do
+    cur = db.get_connection().cursor()
+    cur.execute(f"{REGISTERED_SELECT} ORDER BY id")
+    return [DictStudent(**dict(r)) for r in cur.fetchall()]
+
+
+def measure(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, held, len(result)
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        populate(db.get_connection(), rows)
+
+        cases = [
+            ("dict + dataclass", legacy_get_all),
+            ("slotted model", RegisteredStudentRepo.get_all),
+            ("tuple row view", RegisteredStudentRepo.get_rows),
+        ]
+        print(f"{rows} students, figures per 100k rows")
+        print(f"{'representation':<20}{'ms':>10}{'MB held':>10}{'bytes/row':>11}")
+        scale = 100000 / rows
+        for name, fn in cases:
+            seconds, held, count = measure(fn)
+            print(f"{name:<20}{seconds * 1000 * scale:>10.1f}{held * scale / 1024 / 1024:>10.1f}"
+                  f"{held / max(count, 1):>11.0f}")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,43 @@
+# Compare FTS5 and LIKE search over a synthetic roster.
+# Usage: python -m benchmarks.bench_search [rows]
+import os
+import sys
+import tempfile
+import time
+from app.core import db
+from app.items.repository import RegisteredStudentRepo, _fts_match_expression
+from benchmarks.synthetic import populate
+
+QUERIES = ["juan", "dela cruz", "Santos Maria", "0917", "S0412", "nabun", "zzz"]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(rows: int = 60000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        populate(db.get_connection(), rows)
+        cur = db.get_connection().cursor()
+
+        print(f"{rows} students")
+        print(f"{'query':<16}{'LIKE ms':>10}{'rows':>8}{'FTS5 ms':>10}{'rows':>8}{'speedup':>9}")
+        for q in QUERIES:
+            like_t, like_rows = timed(lambda: RegisteredStudentRepo._search_like(cur, q))
+            match = _fts_match_expression(q)
+            fts_t, fts_rows = timed(lambda: RegisteredStudentRepo._search_fts(cur, match))
+            print(f"{q:<16}{like_t * 1000:>10.2f}{len(like_rows):>8}"
+                  f"{fts_t * 1000:>10.2f}{len(fts_rows):>8}{like_t / fts_t:>8.1f}x")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60000)
@@ -0,0 +1,53 @@
+# Registration screen load: rows plus enrolled IDs from the enrolled roster
+# (two queries, names built for every enrolled student) vs one LEFT JOIN.
+# Usage: python -m benchmarks.bench_status [rows]
+import os
+import sys
+import tempfile
+import time
+from app.core import db
+from app.items.models import ENROLLED, UNENROLLED
+from app.items.repository import RegisteredStudentRepo, EnrolledStudentRepo
+from benchmarks.synthetic import populate
+
+
+def rows_and_enrolled_ids():
+    # What the registration tab did on a cold cache
+    rows = RegisteredStudentRepo.get_rows()
+    enrolled_ids = frozenset(e["id"] for e in EnrolledStudentRepo.iter_all())
+    return rows, enrolled_ids
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 60000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, "bench.db"))
+        db.init_db()
+        populate(db.get_connection(), rows)
+
+        cases = [
+            ("rows + enrolled ids", rows_and_enrolled_ids),
+            ("status join", RegisteredStudentRepo.get_status_rows),
+            ("  enrolled only", lambda: RegisteredStudentRepo.get_status_rows(ENROLLED)),
+            ("  unenrolled only", lambda: RegisteredStudentRepo.get_status_rows(UNENROLLED)),
+            ("search + enrolled ids", lambda: (RegisteredStudentRepo.search("santos"),
+                                               frozenset(e["id"] for e in EnrolledStudentRepo.iter_all()))),
+            ("search status join", lambda: RegisteredStudentRepo.search_status_rows("santos")),
+        ]
+        print(f"{rows} students")
+        print(f"{'load':<24}{'ms':>10}")
+        for name, fn in cases:
+            print(f"{name:<24}{timed(fn) * 1000:>10.1f}")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60000)
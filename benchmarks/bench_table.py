@@ -0,0 +1,61 @@
+# Fill cost of the registered table: QTableWidget items vs the row model.
+# Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_table [rows]
+import os
+import sys
+import time
+import tracemalloc
+from PyQt6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+from app.gui.table_models import RegisteredTableModel
+from app.items.models import RegisteredStatusRow
+from benchmarks.synthetic import student_rows
+
+
+def fill_widget(students):
+    table = QTableWidget(0, 9)
+    for s in students:
+        r = table.rowCount()
+        table.insertRow(r)
+        full_name = f"{s.first_name} {s.middle_name or ''} {s.last_name}".replace("  ", " ").strip()
+        values = [s.id, full_name, s.gender, s.birth_date, str(s.age), s.contact, s.guardian_name,
+                  s.guardian_contact, "Unenrolled" if s.grade_level is None else "Enrolled"]
+        for c, value in enumerate(values):
+            table.setItem(r, c, QTableWidgetItem(value or ""))
+    return table
+
+
+def fill_model(students):
+    view = QTableView()
+    model = RegisteredTableModel(view)
+    view.setModel(model)
+    model.set_students(students)
+    return view
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    QApplication.processEvents()
+    seconds = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, held, result
+
+
+def main(rows: int = 20000):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+    # Every other student enrolled
+    students = [RegisteredStatusRow(*r, *(("11", "STEM") if i % 2 == 0 else (None, None)))
+                for i, r in enumerate(student_rows(rows))]
+    print(f"{rows} students (Python heap only; Qt's C++ allocations are not traced)")
+    print(f"{'table':<16}{'fill ms':>10}{'py MB':>9}")
+    for name, fn in (("QTableWidget", fill_widget), ("row model", fill_model)):
+        seconds, held, widget = measure(fn, students)
+        print(f"{name:<16}{seconds * 1000:>10.0f}{held / 1048576:>9.1f}")
+        widget.deleteLater()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,33 @@
+# Per-record vs columnar validation of synthetic registrations.
+# Usage: python -m benchmarks.bench_validation [rows]
+import sys
+import time
+from app.items.validation import STUDENT_SCHEMA
+from benchmarks.bench_bulk import students
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(rows: int = 100000):
+    records = list(students(rows))
+    cases = [
+        ("all issues per record", lambda: sum(bool(STUDENT_SCHEMA.validate(s)) for s in records)),
+        ("columnar batch", lambda: len(STUDENT_SCHEMA.validate_many(records))),
+    ]
+    print(f"{rows} records")
+    print(f"{'mode':<24}{'ms':>9}{'invalid':>9}{'records/s':>12}")
+    for name, fn in cases:
+        seconds, invalid = timed(fn)
+        print(f"{name:<24}{seconds * 1000:>9.1f}{invalid:>9}{rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,48 @@
+import random
+import sqlite3
+from app.core.db import format_student_id
+
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Angel", "John", "Kristine", "Paolo", "Jasmine",
+               "Carlo", "Patricia", "Miguel", "Andrea", "Rafael", "Nicole", "Gabriel", "Camille", "Joshua", "Bea"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Ramos",
+              "Castillo", "Navarro", "Aquino", "Torres", "Flores", "Gonzales", "Lopez", "Rivera",
+              "Nabunturan", "Fernandez", "Morales", "Domingo"]
+GRADES = ["11", "12"]
+STRANDS = ["STEM", "HUMSS", "GAS", "ICT"]
+
+
+def student_rows(count: int, seed: int = 7, start: int = 1):
+    # Yield registered_students tuples in column order
+    rng = random.Random(seed)
+    for n in range(start, start + count):
+        year = rng.randint(2004, 2009)
+        yield (
+            format_student_id(n),
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES) if rng.random() < 0.8 else None,
+            rng.choice(LAST_NAMES),
+            rng.choice(["Male", "Female"]),
+            f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            2025 - year,
+            "09" + "".join(rng.choice("0123456789") for _ in range(9)),
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "09" + "".join(rng.choice("0123456789") for _ in range(9)),
+        )
+
+
+def populate(conn: sqlite3.Connection, count: int, enrolled_ratio: float = 0.7, seed: int = 7):
+    # Fill an initialised database with `count` students, most of them enrolled
+    rng = random.Random(seed)
+    with conn:
+        conn.executemany("""
+            INSERT INTO registered_students
+            (id, first_name, middle_name, last_name, gender, birth_date, age, contact, guardian_name, guardian_contact)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, student_rows(count, seed))
+        conn.executemany(
+            "INSERT INTO enrolled_students (id, grade_level, strand) VALUES (?, ?, ?)",
+            ((format_student_id(n), rng.choice(GRADES), rng.choice(STRANDS))
+             for n in range(1, count + 1) if rng.random() < enrolled_ratio))
+        conn.execute(
+            "INSERT OR REPLACE INTO id_sequences (name, next_value) VALUES ('registered_students', ?)",
+            (count + 1,))